@@ -0,0 +1,157 @@
+"""
+Micro-batching Inference
+Collects concurrent prediction requests for a short window and runs them
+through a model's predict_batch in a single call on the threadpool, so
+inference never blocks the event loop
+"""
+
+import asyncio
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.models.fraud_model import get_fraud_model
+from app.models.credit_model import get_credit_model
+from app.models.risk_model import get_risk_model
+
+class BatchInferencer:
+    """Queues single predictions and dispatches them in batches"""
+    
+    def __init__(self, predict_batch: Callable[[List[Dict]], List[Dict]],
+                 max_batch_size: int, max_wait_ms: float):
+        self._predict_batch = predict_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        """Start the background batching loop on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the batching loop and fail any requests still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch inferencer stopped"))
+    
+    async def submit(self, features: Dict) -> Dict:
+        """Queue one prediction and wait for its result"""
+        if not self.running:
+            # No batching loop (e.g. app started without lifespan): predict directly
+            return (await run_in_threadpool(self._predict_batch, [features]))[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+    
+    async def _collect(self) -> List[Tuple[Dict, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or the window closes"""
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self._max_wait
+        
+        while len(items) < self._max_batch_size:
+            try:
+                items.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return items
+    
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            
+            try:
+                results = await run_in_threadpool(self._predict_batch, [features for features, _ in items])
+            except asyncio.CancelledError:
+                # Stopped mid-inference: fail the in-flight requests instead of leaving them waiting
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batch inferencer stopped"))
+                raise
+            except Exception:
+                # Isolate the failing request so the rest of the batch still succeeds
+                await self._predict_individually(items)
+                continue
+            
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+    
+    async def _predict_individually(self, items: List[Tuple[Dict, asyncio.Future]]):
+        for features, future in items:
+            if future.done():
+                continue
+            try:
+                result = (await run_in_threadpool(self._predict_batch, [features]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(result)
+
+@lru_cache(maxsize=1)
+def get_fraud_batcher() -> BatchInferencer:
+    """Return the shared batcher for fraud predictions"""
+    return BatchInferencer(get_fraud_model().predict_batch, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT_MS)
+
+@lru_cache(maxsize=1)
+def get_credit_batcher() -> BatchInferencer:
+    """Return the shared batcher for credit predictions"""
+    return BatchInferencer(get_credit_model().predict_batch, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT_MS)
+
+@lru_cache(maxsize=1)
+def get_risk_batcher() -> BatchInferencer:
+    """Return the shared batcher for risk predictions"""
+    return BatchInferencer(get_risk_model().predict_batch, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT_MS)
+
+@lru_cache(maxsize=1)
+def get_fast_risk_batcher() -> BatchInferencer:
+    """Return the shared batcher for fast-mode risk predictions"""
+    return BatchInferencer(
+        partial(get_risk_model().predict_batch, fast_mode=True),
+        settings.BATCH_MAX_SIZE,
+        settings.BATCH_MAX_WAIT_MS
+    )
+
+# FastAPI runs sync dependencies on the threadpool; these resolve on the event loop
+async def provide_fraud_batcher() -> BatchInferencer:
+    return get_fraud_batcher()
+
+async def provide_credit_batcher() -> BatchInferencer:
+    return get_credit_batcher()
+
+async def provide_risk_batcher() -> BatchInferencer:
+    return get_risk_batcher()
+
+def all_batchers() -> List[BatchInferencer]:
+    return [get_fraud_batcher(), get_credit_batcher(), get_risk_batcher(), get_fast_risk_batcher()]
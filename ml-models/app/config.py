@@ -2,31 +2,82 @@
 Configuration management
 """
 
-from pydantic_settings import BaseSettings
-from typing import Optional
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+from dotenv import load_dotenv
 
-class Settings(BaseSettings):
+load_dotenv()
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env_list(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Read a comma-separated environment variable"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+@dataclass(frozen=True)
+class Settings:
     # Server settings
     HOST: str = "0.0.0.0"
     PORT: int = 9000
     DEBUG: bool = False
     
     # Model paths
-    FRAUD_MODEL_PATH: str = "models/fraud_detection_model.pkl"
-    CREDIT_MODEL_PATH: str = "models/credit_scoring_model.pkl"
+    FRAUD_MODEL_PATH: str = "models/fraud_detection_model.ubj"
+    CREDIT_MODEL_PATH: str = "models/credit_scoring_model.ubj"
     RISK_MODEL_PATH: str = "models/risk_scoring_model.pkl"
+    PRELOAD_MODELS: bool = False
     
     # Model settings
     FRAUD_THRESHOLD: float = 0.5
     CREDIT_SCORE_MIN: int = 300
     CREDIT_SCORE_MAX: int = 850
     
+    # Micro-batching settings
+    BATCH_MAX_SIZE: int = 64
+    BATCH_MAX_WAIT_MS: float = 2.0
+    # Threads available for running model inference off the event loop
+    THREADPOOL_SIZE: int = 64
+    
+    # Feature store settings (disabled when REDIS_URL is unset)
+    REDIS_URL: Optional[str] = None
+    FEATURE_STORE_TTL: int = 300
+    
     # API settings
     API_KEY: Optional[str] = None
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # Browser origins allowed by CORS; empty disables the CORS middleware
+    CORS_ORIGINS: Tuple[str, ...] = ("http://localhost:3000",)
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build settings once from the environment"""
+    return Settings(
+        HOST=os.getenv("HOST", Settings.HOST),
+        PORT=int(os.getenv("PORT", Settings.PORT)),
+        DEBUG=_env_bool("DEBUG", Settings.DEBUG),
+        FRAUD_MODEL_PATH=os.getenv("FRAUD_MODEL_PATH", Settings.FRAUD_MODEL_PATH),
+        CREDIT_MODEL_PATH=os.getenv("CREDIT_MODEL_PATH", Settings.CREDIT_MODEL_PATH),
+        RISK_MODEL_PATH=os.getenv("RISK_MODEL_PATH", Settings.RISK_MODEL_PATH),
+        PRELOAD_MODELS=_env_bool("PRELOAD_MODELS", Settings.PRELOAD_MODELS),
+        FRAUD_THRESHOLD=float(os.getenv("FRAUD_THRESHOLD", Settings.FRAUD_THRESHOLD)),
+        CREDIT_SCORE_MIN=int(os.getenv("CREDIT_SCORE_MIN", Settings.CREDIT_SCORE_MIN)),
+        CREDIT_SCORE_MAX=int(os.getenv("CREDIT_SCORE_MAX", Settings.CREDIT_SCORE_MAX)),
+        BATCH_MAX_SIZE=int(os.getenv("BATCH_MAX_SIZE", Settings.BATCH_MAX_SIZE)),
+        BATCH_MAX_WAIT_MS=float(os.getenv("BATCH_MAX_WAIT_MS", Settings.BATCH_MAX_WAIT_MS)),
+        THREADPOOL_SIZE=int(os.getenv("THREADPOOL_SIZE", Settings.THREADPOOL_SIZE)),
+        REDIS_URL=os.getenv("REDIS_URL") or None,
+        FEATURE_STORE_TTL=int(os.getenv("FEATURE_STORE_TTL", Settings.FEATURE_STORE_TTL)),
+        API_KEY=os.getenv("API_KEY") or None,
+        CORS_ORIGINS=_env_list("CORS_ORIGINS", Settings.CORS_ORIGINS)
+    )
 
+settings = get_settings()
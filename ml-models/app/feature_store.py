@@ -0,0 +1,89 @@
+"""
+User Feature Store
+Keeps per-user features in Redis for a short TTL so repeat scoring calls
+for the same user can omit them
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+from app.config import settings
+
+try:
+    import msgpack
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - the feature store is optional
+    msgpack = None
+    redis = None
+
+# User-level features kept in the store, in packed order. Transaction
+# features (amount, hour, beneficiary, device/location risk) are per-call.
+STORED_FEATURES = (
+    'account_age_days', 'monthly_income', 'total_balance',
+    'transaction_count_30d', 'delinquency_count', 'loan_history_count',
+    'transaction_count_24h', 'transaction_count_7d', 'avg_amount_7d'
+)
+
+class FeatureStore:
+    """Redis-backed store of user features packed as msgpack arrays"""
+    
+    def __init__(self, client: "redis.Redis", ttl_seconds: int):
+        self._client = client
+        self._ttl = ttl_seconds
+    
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"user:{user_id}:features"
+    
+    async def get(self, user_id: str) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Fetch stored features for a user
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            Dictionary of stored features, or None on a miss or store error
+        """
+        try:
+            packed = await self._client.get(self._key(user_id))
+        except Exception as e:
+            print(f"Feature store lookup failed: {e}")
+            return None
+        if packed is None:
+            return None
+        
+        try:
+            values = msgpack.unpackb(packed)
+            if len(values) != len(STORED_FEATURES):
+                # Written with a different feature layout; treat as a miss
+                return None
+        except Exception as e:
+            print(f"Feature store value unreadable, ignoring it: {e}")
+            return None
+        return dict(zip(STORED_FEATURES, values))
+    
+    async def put(self, user_id: str, features: Dict[str, Optional[float]]):
+        """Store a user's features with the configured TTL"""
+        packed = msgpack.packb([features.get(name) for name in STORED_FEATURES])
+        try:
+            await self._client.setex(self._key(user_id), self._ttl, packed)
+        except Exception as e:
+            print(f"Feature store write failed: {e}")
+    
+    async def close(self):
+        await self._client.aclose()
+
+@lru_cache(maxsize=1)
+def get_feature_store() -> Optional[FeatureStore]:
+    """Return the shared feature store, or None when Redis is not configured"""
+    if not settings.REDIS_URL:
+        return None
+    if redis is None:
+        print("REDIS_URL is set but redis/msgpack are not installed. Feature store disabled.")
+        return None
+    client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=False)
+    return FeatureStore(client, settings.FEATURE_STORE_TTL)
+
+async def provide_feature_store() -> Optional[FeatureStore]:
+    """FastAPI dependency for the shared feature store, resolved on the event loop"""
+    return get_feature_store()
@@ -3,54 +3,115 @@ ML Models Service - Layer 4
 Serves fraud detection and scoring models via REST API
 """
 
+import os
+
+# One uvicorn worker per core: keep BLAS/OpenMP pools from oversubscribing
+# cores. Must run before numpy/sklearn/xgboost are imported.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import asyncio
+import anyio.to_thread
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 from app.config import settings
 from app.routers import fraud, scoring, health
+from app.models.fraud_model import get_fraud_model
+from app.models.credit_model import get_credit_model
+from app.models.risk_model import get_risk_model
+from app.batching import all_batchers
+from app.feature_store import get_feature_store
+
+# Under a pre-forking server (gunicorn preload_app) this runs once in the
+# master, so workers inherit the models they serve (compiled, ONNX or
+# XGBoost, plus the fused risk graph) instead of each loading them
+if settings.PRELOAD_MODELS:
+    get_risk_model()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load models once per worker at startup, off the event loop"""
+    # Inference runs on the anyio threadpool; size it for concurrent batches
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    
+    await asyncio.gather(
+        run_in_threadpool(get_fraud_model),
+        run_in_threadpool(get_credit_model)
+    )
+    get_risk_model()
+    
+    batchers = all_batchers()
+    for batcher in batchers:
+        batcher.start()
+    yield
+    for batcher in batchers:
+        await batcher.stop()
+    
+    feature_store = get_feature_store()
+    if feature_store is not None:
+        await feature_store.close()
 
 app = FastAPI(
     title="ML Models Service",
     description="Fraud Detection and Scoring Models API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS middleware (skipped when no origins are configured, e.g. behind a gateway)
+if settings.CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings.CORS_ORIGINS),
+        allow_credentials=False,
+        allow_methods=["GET", "POST"],
+        allow_headers=["content-type", "authorization", "x-api-key"],
+        max_age=86400,
+    )
 
 # Include routers
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(fraud.router, prefix="/api/v1/fraud", tags=["fraud"])
 app.include_router(scoring.router, prefix="/api/v1/scoring", tags=["scoring"])
 
+# Static payloads, serialized once at import instead of on every request
+_ROOT_RESPONSE = ORJSONResponse({
+    "service": "ML Models Service",
+    "version": "1.0.0",
+    "models": ["fraud_detection", "credit_scoring", "risk_scoring"]
+})
+
+_HEALTH_RESPONSE = ORJSONResponse({
+    "status": "healthy",
+    "service": "ML Models Service",
+    "version": "1.0.0"
+})
+
 @app.get("/")
 async def root():
-    return {
-        "service": "ML Models Service",
-        "version": "1.0.0",
-        "models": ["fraud_detection", "credit_scoring", "risk_scoring"]
-    }
+    return _ROOT_RESPONSE
 
 @app.get("/health")
 async def health():
     """Health check endpoint (direct)"""
-    return {
-        "status": "healthy",
-        "service": "ML Models Service",
-        "version": "1.0.0"
-    }
+    return _HEALTH_RESPONSE
 
 if __name__ == "__main__":
+    # "auto" picks uvloop/httptools when installed (uvloop is unavailable on Windows)
     uvicorn.run(
         "app.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="auto",
+        http="auto",
+        workers=1 if settings.DEBUG else max(1, os.cpu_count() or 1),
+        access_log=settings.DEBUG
     )
 
@@ -0,0 +1,53 @@
+"""
+Compiled Tree Model Loading
+Prefers a Treelite-compiled shared library next to the trained model file when tl2cgen is installed
+"""
+
+import os
+from typing import Optional
+import numpy as np
+from app.models._threads import MODEL_THREADS
+
+try:
+    import tl2cgen
+except ImportError:  # pragma: no cover - tl2cgen is optional
+    tl2cgen = None
+
+
+def compiled_path_for(model_path: str) -> str:
+    """Return the shared library path that compile_models.py writes for a model path"""
+    return os.path.splitext(model_path)[0] + ".so"
+
+
+class CompiledRunner:
+    """
+    Runs a single-output tree ensemble compiled to native code by tl2cgen
+    
+    The generated library walks the trees as straight-line C with
+    integer-quantized thresholds, avoiding the node pointer chasing of
+    the interpreted predictors.
+    """
+    
+    def __init__(self, predictor: "tl2cgen.Predictor"):
+        self.predictor = predictor
+    
+    def run(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Return the model output for each row of a float32 (N, F) feature matrix"""
+        output = self.predictor.predict(tl2cgen.DMatrix(feature_matrix))
+        # Single-output models come back as (N,) or (N, 1, 1) depending on the tl2cgen version
+        return np.asarray(output).reshape(feature_matrix.shape[0], -1)[:, 0]
+
+
+def load_compiled_runner(model_path: str) -> Optional[CompiledRunner]:
+    """Load the compiled library for a model, or None if unavailable"""
+    path = compiled_path_for(model_path)
+    if tl2cgen is None or not os.path.exists(path):
+        return None
+    
+    try:
+        predictor = tl2cgen.Predictor(path, nthread=MODEL_THREADS)
+        print(f"Loaded compiled model from {path}")
+        return CompiledRunner(predictor)
+    except Exception as e:
+        print(f"Error loading compiled model: {e}. Falling back to the next model format.")
+        return None
@@ -0,0 +1,47 @@
+"""
+Shared Model Loader
+Process-wide cache of joblib and native XGBoost models. Preloading before
+workers fork lets every worker share the model pages copy-on-write.
+Also builds the batched feature matrices the models predict on.
+"""
+
+from typing import Any, Callable, Dict, List
+import joblib
+import numpy as np
+import xgboost as xgb
+from app.models._threads import limit_model_threads
+
+# Files in these formats are loaded as a native XGBoost Booster
+NATIVE_XGBOOST_EXTENSIONS = ('.ubj', '.json')
+
+_models: Dict[str, Any] = {}
+
+
+def load(model_path: str) -> Any:
+    """Load a model from disk without caching it"""
+    if model_path.endswith(NATIVE_XGBOOST_EXTENSIONS):
+        # Native binary format: no pickled Python objects to rebuild
+        booster = xgb.Booster()
+        booster.load_model(model_path)
+        return booster
+    # Memory-map the pickle so forked workers share the tree arrays
+    return joblib.load(model_path, mmap_mode='r')
+
+
+def get(model_path: str) -> Any:
+    """Return the model stored at model_path, loading it once per process"""
+    model = _models.get(model_path)
+    if model is None:
+        model = load(model_path)
+        limit_model_threads(model)
+        _models[model_path] = model
+    return model
+
+
+def stack_features(features_list: List[Dict[str, float]], prepare: Callable[[Dict[str, float]], np.ndarray],
+                   n_features: int, dtype: Any) -> np.ndarray:
+    """Stack prepared feature vectors into one (N, F) matrix so the model is invoked once per batch"""
+    feature_matrix = np.empty((len(features_list), n_features), dtype=dtype)
+    for i, features in enumerate(features_list):
+        feature_matrix[i] = prepare(features)
+    return feature_matrix
@@ -0,0 +1,146 @@
+"""
+Mock Prediction Kernels
+Rule-based scoring ladders used when trained models are unavailable,
+JIT-compiled with Numba when it is installed
+"""
+
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - Numba is optional
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves the function interpreted"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Fast-math flags without nnan/ninf: request features can be NaN or infinite,
+# and the ladders must compare them the way plain Python does
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def fraud_mock(amount: float, beneficiary_age: float, txn_count_24h: float,
+               device_risk: float, location_risk: float) -> float:
+    """Rule-based fraud score in the 0.0-1.0 range"""
+    score = 0.0
+    
+    # Amount factor
+    if amount > 200000:
+        score += 0.4
+    elif amount > 100000:
+        score += 0.2
+    elif amount > 50000:
+        score += 0.1
+    
+    # New beneficiary
+    if beneficiary_age < 7:
+        score += 0.3
+    
+    # Velocity
+    if txn_count_24h > 10:
+        score += 0.3
+    elif txn_count_24h > 5:
+        score += 0.15
+    
+    # Device/location risk
+    score += device_risk * 0.1
+    score += location_risk * 0.1
+    
+    if score > 1.0:
+        score = 1.0
+    
+    return score
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def credit_mock(account_age: float, income: float, balance: float,
+                delinquency: float, loan_history: float) -> float:
+    """Rule-based credit score before clamping to the configured range"""
+    # Base score
+    score = 600.0
+    
+    # Account age factor
+    if account_age > 365:
+        score += 50
+    elif account_age > 180:
+        score += 30
+    elif account_age > 90:
+        score += 15
+    
+    # Income factor
+    if income > 100000:
+        score += 100
+    elif income > 50000:
+        score += 60
+    elif income > 25000:
+        score += 30
+    
+    # Delinquency penalty
+    score -= delinquency * 20
+    
+    # Loan history bonus
+    if loan_history > 0:
+        score += 30
+    
+    # Balance factor
+    if balance > 100000:
+        score += 50
+    elif balance > 50000:
+        score += 30
+    
+    return score
+
+
+# Warm up the JIT so the first request doesn't pay compilation cost
+fraud_mock(0.0, 0.0, 0.0, 0.0, 0.0)
+credit_mock(0.0, 0.0, 0.0, 0.0, 0.0)
+
+# Thresholds of each ladder. Inputs are snapped to a representative of their
+# band that takes the same branch, so cache keys stay exact. Representatives
+# beyond the outermost bound are finite, one unit past it.
+_AMOUNT_BOUNDS = (50000.0, 100000.0, 200000.0)
+_BENEFICIARY_BOUNDS = (7.0,)
+_TXN_24H_BOUNDS = (5.0, 10.0)
+_ACCOUNT_AGE_BOUNDS = (90.0, 180.0, 365.0)
+_INCOME_BOUNDS = (25000.0, 50000.0, 100000.0)
+_BALANCE_BOUNDS = (50000.0, 100000.0)
+_LOAN_HISTORY_BOUNDS = (0.0,)
+
+def _snap_gt(value: float, bounds: tuple) -> float:
+    """Snap a value tested with `>` ladders to its band representative"""
+    band = bisect_left(bounds, value)
+    return bounds[band] if band < len(bounds) else bounds[-1] + 1.0
+
+def _snap_lt(value: float, bounds: tuple) -> float:
+    """Snap a value tested with `<` ladders to its band representative"""
+    band = bisect_right(bounds, value)
+    return bounds[band - 1] if band else bounds[0] - 1.0
+
+_cached_fraud_mock = lru_cache(maxsize=4096)(fraud_mock)
+_cached_credit_mock = lru_cache(maxsize=4096)(credit_mock)
+
+def fraud_mock_cached(amount: float, beneficiary_age: float, txn_count_24h: float,
+                      device_risk: float, location_risk: float) -> float:
+    """Memoized fraud_mock keyed on band-snapped ladder inputs"""
+    return _cached_fraud_mock(
+        _snap_gt(amount, _AMOUNT_BOUNDS),
+        _snap_lt(beneficiary_age, _BENEFICIARY_BOUNDS),
+        _snap_gt(txn_count_24h, _TXN_24H_BOUNDS),
+        device_risk,
+        location_risk
+    )
+
+def credit_mock_cached(account_age: float, income: float, balance: float,
+                       delinquency: float, loan_history: float) -> float:
+    """Memoized credit_mock keyed on band-snapped ladder inputs"""
+    return _cached_credit_mock(
+        _snap_gt(account_age, _ACCOUNT_AGE_BOUNDS),
+        _snap_gt(income, _INCOME_BOUNDS),
+        _snap_gt(balance, _BALANCE_BOUNDS),
+        delinquency,
+        _snap_gt(loan_history, _LOAN_HISTORY_BOUNDS)
+    )
@@ -0,0 +1,118 @@
+"""
+ONNX Runtime Loading
+Prefers a converted .onnx model next to the trained model file when onnxruntime is installed
+"""
+
+import os
+import threading
+from typing import Optional, Tuple
+import numpy as np
+from app.models._threads import MODEL_THREADS
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - ONNX Runtime is optional
+    ort = None
+
+
+# Input and output names of the fused risk graph built by convert_models.py
+FUSED_RISK_INPUTS = ("credit_input", "fraud_input")
+FUSED_RISK_OUTPUTS = ("credit_score", "fraud_risk")
+
+
+def onnx_path_for(model_path: str) -> str:
+    """Return the .onnx path that convert_models.py writes for a model path"""
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+
+class _SingleRowBinding:
+    """Preallocated (1, F) input and output buffers bound to a session"""
+    
+    def __init__(self, session: "ort.InferenceSession", input_name: str, output_name: str,
+                 n_features: int, output_shape: Tuple[int, ...]):
+        self.row = np.empty((1, n_features), dtype=np.float32)
+        self.output = np.empty(output_shape, dtype=np.float32)
+        # OrtValues built from NumPy arrays share their memory on CPU
+        self._input_value = ort.OrtValue.ortvalue_from_numpy(self.row)
+        self._output_value = ort.OrtValue.ortvalue_from_numpy(self.output)
+        self.io = session.io_binding()
+        self.io.bind_ortvalue_input(input_name, self._input_value)
+        self.io.bind_ortvalue_output(output_name, self._output_value)
+
+
+class OnnxRunner:
+    """
+    Runs a single-input ONNX model and returns one of its outputs
+    
+    Single-row calls reuse a per-thread IO binding whose input and output
+    buffers are preallocated, so the B=1 hot path allocates nothing inside
+    ONNX Runtime. Larger batches go through a regular session run.
+    """
+    
+    def __init__(self, session: "ort.InferenceSession", output_index: int):
+        self.session = session
+        model_input = session.get_inputs()[0]
+        model_output = session.get_outputs()[output_index]
+        self._input_name = model_input.name
+        self._output_name = model_output.name
+        self._n_features = model_input.shape[1]
+        # IO binding needs a static feature width
+        self._bindable = isinstance(self._n_features, int)
+        self._output_shape = self._probe_output_shape() if self._bindable else None
+        self._local = threading.local()
+    
+    def _probe_output_shape(self) -> Tuple[int, ...]:
+        """
+        Return the single-row output shape from one run of the model
+        
+        Declared output shapes are not reliable: onnxmltools declares a
+        converted Booster's probabilities as (N, 1) while producing (N, 2).
+        """
+        row = np.zeros((1, self._n_features), dtype=np.float32)
+        return self.session.run([self._output_name], {self._input_name: row})[0].shape
+    
+    def run(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Return the selected output for a float32 (N, F) feature matrix"""
+        if feature_matrix.shape[0] != 1 or not self._bindable:
+            return self.session.run([self._output_name], {self._input_name: feature_matrix})[0]
+        
+        binding = self._single_row_binding()
+        binding.row[...] = feature_matrix
+        self.session.run_with_iobinding(binding.io)
+        return binding.output.copy()
+    
+    def _single_row_binding(self) -> _SingleRowBinding:
+        binding = getattr(self._local, "binding", None)
+        if binding is None:
+            binding = _SingleRowBinding(
+                self.session, self._input_name, self._output_name,
+                self._n_features, self._output_shape
+            )
+            self._local.binding = binding
+        return binding
+
+
+def load_onnx_session(path: str) -> Optional["ort.InferenceSession"]:
+    """Create an ONNX Runtime session for an .onnx file, or None if unavailable"""
+    if ort is None or not os.path.exists(path):
+        return None
+    
+    try:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = MODEL_THREADS
+        options.inter_op_num_threads = MODEL_THREADS
+        session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        print(f"Loaded ONNX model from {path}")
+        return session
+    except Exception as e:
+        print(f"Error loading ONNX model from {path}: {e}")
+        return None
+
+
+def load_onnx_runner(model_path: str, output_index: int) -> Optional[OnnxRunner]:
+    """Create an ONNX Runtime runner for a model, or None if unavailable"""
+    session = load_onnx_session(onnx_path_for(model_path))
+    if session is None:
+        return None
+    return OnnxRunner(session, output_index)
@@ -0,0 +1,23 @@
+"""
+Model Thread Limits
+Keeps each worker's estimators single-threaded so that uvicorn workers,
+not library thread pools, provide parallelism
+"""
+
+# Threads per model predictor, session or library; workers provide
+# parallelism, so per-model thread pools would only oversubscribe cores
+MODEL_THREADS = 1
+
+def limit_model_threads(model) -> None:
+    """Force a loaded sklearn/XGBoost estimator to predict on MODEL_THREADS threads"""
+    try:
+        model.set_params(n_jobs=MODEL_THREADS)
+    except Exception:
+        pass
+    
+    try:
+        # Native XGBoost models load as a bare Booster
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        booster.set_param({'nthread': MODEL_THREADS})
+    except Exception:
+        pass
@@ -1,39 +1,94 @@
 """
 Credit Scoring Model
-Uses Random Forest for credit scoring
+Uses XGBoost regression for credit scoring
 """
 
 import numpy as np
-import joblib
+import xgboost as xgb
+from bisect import bisect_right
+import operator
 import os
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from app.config import settings
+from app.models._mock_kernels import credit_mock_cached
+from app.models import _loader
+from app.models._onnx import load_onnx_runner
+from app.models._compiled import load_compiled_runner
+
+# Valid credit score range
+_SCORE_MIN = settings.CREDIT_SCORE_MIN
+_SCORE_MAX = settings.CREDIT_SCORE_MAX
+
+# (feature, factor, below, message when below, above, message when above)
+_CREDIT_FACTOR_RULES = (
+    ('account_age_days', 'account_age', 90, "New account - negative impact",
+     365, "Established account - positive impact"),
+    ('delinquency_count', 'delinquency', float('-inf'), None,
+     0, "{value} delinquencies - negative impact"),
+    ('monthly_income', 'income', 25000, "Low income - negative impact",
+     100000, "High income - positive impact"),
+)
 
 class CreditScoringModel:
-    """Credit scoring model using Random Forest"""
+    """Credit scoring model using XGBoost regression"""
+    
+    _FEATURE_DTYPE = np.float32
+    
+    # Score band lower bounds and their (risk category, score range), lowest band first
+    _SCORE_BOUNDS = (600, 650, 700, 750)
+    _SCORE_CLASSES = (
+        ('HIGH', 'VERY_POOR'),
+        ('MEDIUM_HIGH', 'POOR'),
+        ('MEDIUM', 'FAIR'),
+        ('MEDIUM_LOW', 'GOOD'),
+        ('LOW', 'EXCELLENT'),
+    )
     
     def __init__(self, model_path: Optional[str] = None):
         self.model_path = model_path or settings.CREDIT_MODEL_PATH
         self.model = None
+        self._booster = None
+        self._onnx = None
+        self._compiled = None
         self.feature_names = [
             'account_age_days', 'monthly_income', 'total_balance',
             'transaction_count_30d', 'delinquency_count', 'loan_history_count',
             'avg_transaction_amount', 'credit_utilization', 'savings_ratio'
         ]
+        self._defaults = {name: 0.0 for name in self.feature_names}
+        self._getter = operator.itemgetter(*self.feature_names)
         self.load_model()
     
     def load_model(self):
-        """Load the trained model"""
+        """Load the trained model, preferring its compiled library, then its ONNX export"""
+        self._onnx = None
+        self._compiled = load_compiled_runner(self.model_path)
+        if self._compiled is not None:
+            self.model = self._compiled.predictor
+            self._booster = None
+            return
+        
+        self._onnx = load_onnx_runner(self.model_path, output_index=0)
+        if self._onnx is not None:
+            self.model = self._onnx.session
+            self._booster = None
+            return
+        
         if os.path.exists(self.model_path):
             try:
-                self.model = joblib.load(self.model_path)
+                self.model = _loader.get(self.model_path)
+                # Native models load as a bare Booster; older pickles keep model.predict
+                self._booster = self.model if isinstance(self.model, xgb.Booster) else None
                 print(f"Loaded credit scoring model from {self.model_path}")
             except Exception as e:
                 print(f"Error loading model: {e}. Using mock model.")
                 self.model = None
+                self._booster = None
         else:
             print(f"Model file not found at {self.model_path}. Using mock model.")
             self.model = None
+            self._booster = None
     
     def predict(self, features: Dict[str, float]) -> Dict[str, any]:
         """
@@ -53,128 +108,122 @@ class CreditScoringModel:
         feature_vector = self._prepare_features(features)
         
         # Predict credit score (300-850 range)
-        credit_score = self.model.predict([feature_vector])[0]
+        credit_score = self._predict_scores(feature_vector.reshape(1, -1))[0]
         
-        # Ensure score is in valid range
-        credit_score = max(settings.CREDIT_SCORE_MIN, min(settings.CREDIT_SCORE_MAX, credit_score))
+        return self._build_result(credit_score, features)
+    
+    def predict_batch(self, features_list: List[Dict[str, float]]) -> List[Dict[str, any]]:
+        """
+        Predict credit scores for a batch of applicants
         
-        # Calculate risk category
-        risk_category = self._get_risk_category(credit_score)
-        score_range = self._get_score_range(credit_score)
+        Args:
+            features_list: List of feature dictionaries
+            
+        Returns:
+            List of dictionaries with credit_score and risk_category, in input order
+        """
+        build = self._build_result
+        return [build(score, features) for score, features in zip(self.score_batch(features_list), features_list)]
+    
+    def score_batch(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """Return the credit score, clamped to the valid range, for each feature dictionary"""
+        if self.model is None:
+            scores = np.fromiter(
+                (self._mock_score(features) for features in features_list),
+                dtype=np.float64,
+                count=len(features_list)
+            )
+        elif not features_list:
+            scores = np.empty(0, dtype=np.float64)
+        else:
+            feature_matrix = _loader.stack_features(
+                features_list, self._prepare_features, len(self.feature_names), self._FEATURE_DTYPE
+            )
+            scores = self._predict_scores(feature_matrix)
+        
+        return np.clip(scores, _SCORE_MIN, _SCORE_MAX)
+    
+    def score_rows(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """
+        Return the credit score, clamped to the valid range, for each row of a prepared feature matrix
+        
+        Args:
+            feature_matrix: 2-D array with one column per entry of feature_names
+            
+        Returns:
+            Array of credit scores, one per row
+        """
+        if self.model is None:
+            scores = np.fromiter(
+                (credit_mock_cached(float(row[0]), float(row[1]), float(row[2]), float(row[4]), float(row[5]))
+                 for row in feature_matrix),
+                dtype=np.float64,
+                count=len(feature_matrix)
+            )
+        else:
+            scores = self._predict_scores(np.asarray(feature_matrix, dtype=self._FEATURE_DTYPE))
+        
+        return np.clip(scores, _SCORE_MIN, _SCORE_MAX)
+    
+    def _predict_scores(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Return the raw credit score for each row of the feature matrix"""
+        if self._compiled is not None:
+            return self._compiled.run(feature_matrix)
+        if self._onnx is not None:
+            return self._onnx.run(feature_matrix)[:, 0]
+        if self._booster is not None:
+            return self._booster.inplace_predict(feature_matrix)
+        return self.model.predict(feature_matrix)
+    
+    def _prepare_features(self, features: Dict[str, float]) -> np.ndarray:
+        """Prepare feature vector from input dictionary"""
+        merged = {**self._defaults, **features}
+        return np.asarray(self._getter(merged), dtype=self._FEATURE_DTYPE)
+    
+    def _build_result(self, score: float, features: Dict[str, float]) -> Dict[str, any]:
+        """Build prediction response from a raw credit score"""
+        # Ensure score is in valid range
+        score = max(_SCORE_MIN, min(_SCORE_MAX, score))
+        risk_category, score_range = self._classify(score)
         
         return {
-            "credit_score": int(credit_score),
+            "credit_score": int(score),
             "risk_category": risk_category,
             "score_range": score_range,
             "factors": self._get_factor_analysis(features)
         }
     
-    def _prepare_features(self, features: Dict[str, float]) -> list:
-        """Prepare feature vector from input dictionary"""
-        feature_vector = []
-        for feature_name in self.feature_names:
-            value = features.get(feature_name, 0.0)
-            feature_vector.append(float(value))
-        return feature_vector
-    
-    def _get_risk_category(self, score: float) -> str:
-        """Get risk category from credit score"""
-        if score >= 750:
-            return "LOW"
-        elif score >= 700:
-            return "MEDIUM_LOW"
-        elif score >= 650:
-            return "MEDIUM"
-        elif score >= 600:
-            return "MEDIUM_HIGH"
-        else:
-            return "HIGH"
-    
-    def _get_score_range(self, score: float) -> str:
-        """Get score range classification"""
-        if score >= 750:
-            return "EXCELLENT"
-        elif score >= 700:
-            return "GOOD"
-        elif score >= 650:
-            return "FAIR"
-        elif score >= 600:
-            return "POOR"
-        else:
-            return "VERY_POOR"
+    def _classify(self, score: float) -> Tuple[str, str]:
+        """Get risk category and score range from credit score in one pass"""
+        return self._SCORE_CLASSES[bisect_right(self._SCORE_BOUNDS, score)]
     
     def _get_factor_analysis(self, features: Dict[str, float]) -> Dict[str, str]:
         """Analyze factors affecting credit score"""
         factors = {}
-        
-        account_age = features.get('account_age_days', 0)
-        if account_age < 90:
-            factors['account_age'] = "New account - negative impact"
-        elif account_age > 365:
-            factors['account_age'] = "Established account - positive impact"
-        
-        delinquency = features.get('delinquency_count', 0)
-        if delinquency > 0:
-            factors['delinquency'] = f"{delinquency} delinquencies - negative impact"
-        
-        income = features.get('monthly_income', 0)
-        if income > 100000:
-            factors['income'] = "High income - positive impact"
-        elif income < 25000:
-            factors['income'] = "Low income - negative impact"
-        
+        for feature, factor, low, low_message, high, high_message in _CREDIT_FACTOR_RULES:
+            value = features.get(feature, 0)
+            if value < low:
+                factors[factor] = low_message.format(value=value)
+            elif value > high:
+                factors[factor] = high_message.format(value=value)
         return factors
     
     def _mock_predict(self, features: Dict[str, float]) -> Dict[str, any]:
         """Mock prediction when model is not available"""
-        account_age = features.get('account_age_days', 365.0)
-        income = features.get('monthly_income', 50000.0)
-        balance = features.get('total_balance', 100000.0)
-        delinquency = features.get('delinquency_count', 0.0)
-        loan_history = features.get('loan_history_count', 0.0)
-        
-        # Base score
-        score = 600.0
-        
-        # Account age factor
-        if account_age > 365:
-            score += 50
-        elif account_age > 180:
-            score += 30
-        elif account_age > 90:
-            score += 15
-        
-        # Income factor
-        if income > 100000:
-            score += 100
-        elif income > 50000:
-            score += 60
-        elif income > 25000:
-            score += 30
-        
-        # Delinquency penalty
-        score -= delinquency * 20
-        
-        # Loan history bonus
-        if loan_history > 0:
-            score += 30
-        
-        # Balance factor
-        if balance > 100000:
-            score += 50
-        elif balance > 50000:
-            score += 30
-        
-        # Cap at valid range
-        score = max(settings.CREDIT_SCORE_MIN, min(settings.CREDIT_SCORE_MAX, score))
-        
-        return {
-            "credit_score": int(score),
-            "risk_category": self._get_risk_category(score),
-            "score_range": self._get_score_range(score),
-            "factors": self._get_factor_analysis(features)
-        }
+        return self._build_result(self._mock_score(features), features)
+    
+    def _mock_score(self, features: Dict[str, float]) -> float:
+        """Rule-based credit score used when model is not available"""
+        return credit_mock_cached(
+            float(features.get('account_age_days', 365.0)),
+            float(features.get('monthly_income', 50000.0)),
+            float(features.get('total_balance', 100000.0)),
+            float(features.get('delinquency_count', 0.0)),
+            float(features.get('loan_history_count', 0.0))
+        )
 
-# Global model instance
-credit_model = CreditScoringModel()
+@lru_cache(maxsize=1)
+def get_credit_model() -> CreditScoringModel:
+    """Return the shared credit scoring model, loading it on first use"""
+    return CreditScoringModel()
 
@@ -4,17 +4,36 @@ Uses XGBoost for fraud detection
 """
 
 import numpy as np
-import joblib
+import xgboost as xgb
+from bisect import bisect_right
+import operator
 import os
+from functools import lru_cache
 from typing import Dict, List, Optional
 from app.config import settings
+from app.models._mock_kernels import fraud_mock_cached
+from app.models import _loader
+from app.models._onnx import load_onnx_runner
+from app.models._compiled import load_compiled_runner
+
+# Hot-path settings captured once at import
+_FRAUD_THR = settings.FRAUD_THRESHOLD
+
+# Risk level lookup: scores at or above each bound move up one label
+_RISK_BOUNDS = (0.4, 0.7)
+_RISK_LABELS = ("LOW", "MEDIUM", "HIGH")
 
 class FraudDetectionModel:
     """Fraud detection model using XGBoost"""
     
+    _FEATURE_DTYPE = np.float32
+    
     def __init__(self, model_path: Optional[str] = None):
         self.model_path = model_path or settings.FRAUD_MODEL_PATH
         self.model = None
+        self._booster = None
+        self._onnx = None
+        self._compiled = None
         self.feature_names = [
             'amount', 'hour', 'day_of_week', 'transaction_count_24h',
             'transaction_count_7d', 'avg_amount_7d', 'beneficiary_age_days',
@@ -22,20 +41,43 @@ class FraudDetectionModel:
             'user_balance', 'is_new_beneficiary', 'is_unusual_hour',
             'amount_vs_avg_ratio', 'velocity_score'
         ]
+        self._n_features = len(self.feature_names)
+        self._defaults = {name: 0.0 for name in self.feature_names}
+        self._getter = operator.itemgetter(*self.feature_names)
         self.load_model()
     
     def load_model(self):
-        """Load the trained model"""
+        """Load the trained model, preferring its compiled library, then its ONNX export"""
+        self._onnx = None
+        self._compiled = load_compiled_runner(self.model_path)
+        if self._compiled is not None:
+            self.model = self._compiled.predictor
+            self._booster = None
+            return
+        
+        self._onnx = load_onnx_runner(self.model_path, output_index=1)
+        if self._onnx is not None:
+            self.model = self._onnx.session
+            self._booster = None
+            return
+        
         if os.path.exists(self.model_path):
             try:
-                self.model = joblib.load(self.model_path)
+                self.model = _loader.get(self.model_path)
+                # Predict through the raw booster to skip sklearn validation
+                if isinstance(self.model, xgb.Booster):
+                    self._booster = self.model
+                else:
+                    self._booster = self.model.get_booster() if hasattr(self.model, 'get_booster') else None
                 print(f"Loaded fraud detection model from {self.model_path}")
             except Exception as e:
                 print(f"Error loading model: {e}. Using mock model.")
                 self.model = None
+                self._booster = None
         else:
             print(f"Model file not found at {self.model_path}. Using mock model.")
             self.model = None
+            self._booster = None
     
     def predict(self, features: Dict[str, float]) -> Dict[str, float]:
         """
@@ -52,77 +94,114 @@ class FraudDetectionModel:
             return self._mock_predict(features)
         
         # Prepare feature vector
-        feature_vector = self._prepare_features(features)
+        feature_matrix = self._prepare_features(features).reshape(1, -1)
         
         # Predict
-        fraud_probability = self.model.predict_proba([feature_vector])[0][1]
+        fraud_probability = self._predict_proba(feature_matrix)[0]
+        
+        return self._build_result(fraud_probability)
+    
+    def predict_batch(self, features_list: List[Dict[str, float]]) -> List[Dict[str, float]]:
+        """
+        Predict fraud probability for a batch of transactions
+        
+        Args:
+            features_list: List of feature dictionaries
+            
+        Returns:
+            List of dictionaries with fraud_score and risk_level, in input order
+        """
+        build = self._build_result
+        return [build(p) for p in self.score_batch(features_list)]
+    
+    def score_batch(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """Return the fraud probability for each feature dictionary, in input order"""
+        if self.model is None:
+            return np.fromiter(
+                (self._mock_score(features) for features in features_list),
+                dtype=np.float64,
+                count=len(features_list)
+            )
         
-        # Determine risk level
-        risk_level = self._get_risk_level(fraud_probability)
+        if not features_list:
+            return np.empty(0, dtype=np.float64)
         
+        feature_matrix = _loader.stack_features(
+            features_list, self._prepare_features, self._n_features, self._FEATURE_DTYPE
+        )
+        return self._predict_proba(feature_matrix)
+    
+    def score_rows(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """
+        Return the fraud probability for each row of a prepared feature matrix
+        
+        Args:
+            feature_matrix: 2-D array with one column per entry of feature_names
+            
+        Returns:
+            Array of fraud probabilities, one per row
+        """
+        if self.model is None:
+            return np.fromiter(
+                (fraud_mock_cached(float(row[0]), float(row[6]), float(row[3]), float(row[7]), float(row[8]))
+                 for row in feature_matrix),
+                dtype=np.float64,
+                count=len(feature_matrix)
+            )
+        
+        return self._predict_proba(np.asarray(feature_matrix, dtype=self._FEATURE_DTYPE))
+    
+    def _predict_proba(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Return the fraud-class probability for each row of the feature matrix"""
+        if self._compiled is not None:
+            return self._compiled.run(feature_matrix)
+        if self._onnx is not None:
+            # Output 1 holds [P(legit), P(fraud)] per row
+            return self._onnx.run(feature_matrix)[:, 1]
+        if self._booster is not None:
+            try:
+                return self._booster.inplace_predict(feature_matrix)
+            except Exception as e:
+                if self._booster is self.model:
+                    # A native model has no sklearn wrapper to fall back to
+                    return self._booster.predict(xgb.DMatrix(feature_matrix))
+                print(f"Booster inplace prediction failed: {e}. Falling back to predict_proba.")
+                self._booster = None
+        return self.model.predict_proba(feature_matrix)[:, 1]
+    
+    def _prepare_features(self, features: Dict[str, float]) -> np.ndarray:
+        """Prepare feature vector from input dictionary"""
+        merged = {**self._defaults, **features}
+        return np.asarray(self._getter(merged), dtype=self._FEATURE_DTYPE)
+    
+    def _build_result(self, fraud_probability: float) -> Dict[str, float]:
+        """Build prediction response from fraud probability"""
         return {
             "fraud_score": float(fraud_probability),
-            "risk_level": risk_level,
-            "is_fraud": fraud_probability >= settings.FRAUD_THRESHOLD
+            "risk_level": self._get_risk_level(fraud_probability),
+            "is_fraud": bool(fraud_probability >= _FRAUD_THR)
         }
     
-    def _prepare_features(self, features: Dict[str, float]) -> List[float]:
-        """Prepare feature vector from input dictionary"""
-        feature_vector = []
-        for feature_name in self.feature_names:
-            value = features.get(feature_name, 0.0)
-            feature_vector.append(float(value))
-        return feature_vector
-    
     def _get_risk_level(self, score: float) -> str:
         """Get risk level from fraud score"""
-        if score >= 0.7:
-            return "HIGH"
-        elif score >= 0.4:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        return _RISK_LABELS[bisect_right(_RISK_BOUNDS, score)]
     
     def _mock_predict(self, features: Dict[str, float]) -> Dict[str, float]:
         """Mock prediction when model is not available"""
-        amount = features.get('amount', 0.0)
-        beneficiary_age = features.get('beneficiary_age_days', 365.0)
-        txn_count_24h = features.get('transaction_count_24h', 0.0)
-        
-        # Simple rule-based scoring
-        score = 0.0
-        
-        # Amount factor
-        if amount > 200000:
-            score += 0.4
-        elif amount > 100000:
-            score += 0.2
-        elif amount > 50000:
-            score += 0.1
-        
-        # New beneficiary
-        if beneficiary_age < 7:
-            score += 0.3
-        
-        # Velocity
-        if txn_count_24h > 10:
-            score += 0.3
-        elif txn_count_24h > 5:
-            score += 0.15
-        
-        # Device/location risk
-        score += features.get('device_risk', 0.0) * 0.1
-        score += features.get('location_risk', 0.0) * 0.1
-        
-        if score > 1.0:
-            score = 1.0
-        
-        return {
-            "fraud_score": float(score),
-            "risk_level": self._get_risk_level(score),
-            "is_fraud": score >= settings.FRAUD_THRESHOLD
-        }
+        return self._build_result(self._mock_score(features))
+    
+    def _mock_score(self, features: Dict[str, float]) -> float:
+        """Rule-based fraud score used when model is not available"""
+        return fraud_mock_cached(
+            float(features.get('amount', 0.0)),
+            float(features.get('beneficiary_age_days', 365.0)),
+            float(features.get('transaction_count_24h', 0.0)),
+            float(features.get('device_risk', 0.0)),
+            float(features.get('location_risk', 0.0))
+        )
 
-# Global model instance
-fraud_model = FraudDetectionModel()
+@lru_cache(maxsize=1)
+def get_fraud_model() -> FraudDetectionModel:
+    """Return the shared fraud detection model, loading it on first use"""
+    return FraudDetectionModel()
 
@@ -3,70 +3,244 @@ Risk Scoring Model
 Combines credit and fraud scores for overall risk assessment
 """
 
-from typing import Dict
-from app.models.fraud_model import fraud_model
-from app.models.credit_model import credit_model
+import numpy as np
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.models.fraud_model import FraudDetectionModel, get_fraud_model
+from app.models.credit_model import CreditScoringModel, get_credit_model
+from app.models._onnx import FUSED_RISK_INPUTS, FUSED_RISK_OUTPUTS, load_onnx_session, onnx_path_for
+
+# Overall risk below each bound maps to that label; bounds are exclusive for
+# categories (risk < bound) and inclusive for recommendations (risk <= bound)
+_RISK_CATEGORY_BOUNDS = (0.3, 0.6)
+_RISK_CATEGORY_LABELS = ("LOW", "MEDIUM", "HIGH")
+_RECOMMENDATION_BOUNDS = (0.4, 0.7)
+_RECOMMENDATION_LABELS = ("APPROVE", "REVIEW", "BLOCK")
+
+# Credit risk range implied by the clamped credit score range
+_CREDIT_RISK_MIN = 1.0 - (int(settings.CREDIT_SCORE_MAX) / 850.0)
+_CREDIT_RISK_MAX = 1.0 - (int(settings.CREDIT_SCORE_MIN) / 850.0)
+
+# Amounts up to and including each bound carry the matching risk
+_AMOUNT_RISK_BOUNDS = (50000, 100000, 200000)
+_AMOUNT_RISKS = (0.1, 0.3, 0.5, 0.8)
+
+# Amount risk per 1000-wide bucket: bucket k covers ((k-1)*1000, k*1000].
+# Every bound is a bucket edge, so indexing by the ceiling bucket is exact;
+# the last bucket holds everything above the top bound.
+_AMOUNT_BUCKET = 1000
+_AMOUNT_LUT_LAST = _AMOUNT_RISK_BOUNDS[-1] // _AMOUNT_BUCKET + 1
+_AMOUNT_RISK_LUT = np.array(_AMOUNT_RISKS)[
+    np.searchsorted(_AMOUNT_RISK_BOUNDS, np.arange(_AMOUNT_LUT_LAST + 1) * _AMOUNT_BUCKET, side='left')
+]
+_AMOUNT_RISK_LUT_VALUES = tuple(_AMOUNT_RISK_LUT.tolist())
+# Amounts are clamped into [0, _AMOUNT_LUT_MAX] before the integer bucket
+# cast, so infinities land in the end buckets instead of overflowing it
+_AMOUNT_LUT_MAX = float(_AMOUNT_LUT_LAST * _AMOUNT_BUCKET)
+
+# Appended to a cache key for fast-mode results that skipped the credit model
+_FAST_KEY_SUFFIX = ('fast',)
+
+# Known input features in cache-key order. Values are kept exact: they are
+# also the model inputs, and every one of them can move a score across a
+# category or recommendation bound. Unknown request keys never reach the key.
+_CACHE_KEY_NAMES = (
+    'account_age_days', 'monthly_income', 'total_balance',
+    'transaction_count_30d', 'delinquency_count', 'loan_history_count',
+    'avg_transaction_amount', 'credit_utilization', 'savings_ratio',
+    'amount', 'hour', 'day_of_week', 'transaction_count_24h',
+    'transaction_count_7d', 'avg_amount_7d', 'beneficiary_age_days',
+    'device_risk', 'location_risk'
+)
+
+# Credit model inputs, in the credit model's feature order, with risk-scoring defaults
+_CREDIT_COLS = (
+    'account_age_days', 'monthly_income', 'total_balance',
+    'transaction_count_30d', 'delinquency_count', 'loan_history_count',
+    'avg_transaction_amount', 'credit_utilization', 'savings_ratio'
+)
+_CREDIT_DEFAULTS = np.array(
+    [365.0, 50000.0, 100000.0, 10.0, 0.0, 0.0, 10000.0, 0.3, 0.2],
+    dtype=np.float64
+)
+
+# Request features read into the leading fraud model columns, in the fraud
+# model's feature order, with risk-scoring defaults. The last four columns
+# are derived from these by _derive_fraud_features.
+_FRAUD_COLS = (
+    'amount', 'hour', 'day_of_week', 'transaction_count_24h',
+    'transaction_count_7d', 'avg_amount_7d', 'beneficiary_age_days',
+    'device_risk', 'location_risk', 'account_age_days', 'total_balance'
+)
+_FRAUD_DEFAULTS = np.array(
+    [0.0, 12.0, 3.0, 0.0, 5.0, 10000.0, 365.0, 0.0, 0.0, 365.0, 100000.0,
+     0.0, 0.0, 0.0, 0.0],
+    dtype=np.float64
+)
+_FRAUD_WIDTH = len(_FRAUD_DEFAULTS)
+
+# Position of each column's source feature within a cache key
+_CREDIT_KEY_INDEX = tuple(_CACHE_KEY_NAMES.index(name) for name in _CREDIT_COLS)
+_FRAUD_KEY_INDEX = tuple(_CACHE_KEY_NAMES.index(name) for name in _FRAUD_COLS)
+_AVG_AMOUNT_KEY_INDEX = _CACHE_KEY_NAMES.index('avg_amount_7d')
+
+def _fill_row(row: np.ndarray, key: Tuple, key_index: Tuple[int, ...]):
+    """Copy the features present in a cache key into their row columns"""
+    for column, position in enumerate(key_index):
+        value = key[position]
+        if value is not None:
+            row[column] = value
+
+def _derive_fraud_features(row: np.ndarray, has_avg_amount: bool):
+    """Fill the derived fraud columns from the already-filled input columns"""
+    hour = row[1]
+    row[11] = 1.0 if row[6] < 7 else 0.0
+    row[12] = 1.0 if hour < 6 or hour > 23 else 0.0
+    # A missing 7-day average divides by 1, not by its 10000 column default
+    row[13] = row[0] / (max(row[5], 1.0) if has_avg_amount else 1.0)
+    row[14] = min(row[3] / 10.0, 1.0)
+
+class _PredictionCache:
+    """Thread-safe LRU cache of risk predictions keyed on feature tuples"""
+    
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, *keys: Tuple) -> Optional[Dict]:
+        """Return the result stored under the first present key, counting one hit or miss"""
+        with self._lock:
+            for key in keys:
+                result = self._data.get(key)
+                if result is not None:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+            return None
+    
+    def put(self, key: Tuple, result: Dict):
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+    
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self._maxsize,
+            "currsize": len(self._data)
+        }
 
 class RiskScoringModel:
     """Overall risk scoring model combining multiple factors"""
     
-    def predict(self, features: Dict) -> Dict[str, any]:
+    _CACHE_SIZE = 8192
+    
+    def __init__(self, credit_model: CreditScoringModel, fraud_model: FraudDetectionModel):
+        self.credit_model = credit_model
+        self.fraud_model = fraud_model
+        self._cache = _PredictionCache(self._CACHE_SIZE)
+        self._fused = self._load_fused_session()
+    
+    def _load_fused_session(self):
+        """Load the fused credit+fraud ONNX graph when both sub-models are served through ONNX"""
+        if self.credit_model._onnx is None or self.fraud_model._onnx is None:
+            # Mock, compiled or Booster sub-models would disagree with a fused ONNX graph
+            return None
+        return load_onnx_session(onnx_path_for(settings.RISK_MODEL_PATH))
+    
+    def predict(self, features: Dict, fast_mode: bool = False) -> Dict[str, any]:
         """
         Predict overall risk score
         
+        Predictions are memoized on the tuple of known input features, so
+        repeated feature vectors skip the sub-models.
+        
+        With fast_mode, the fraud model is evaluated first and the credit
+        model is skipped when no credit score in the valid range could change
+        the risk category or recommendation. Such results report
+        credit_score and credit_risk as None and the worst-case
+        overall_risk_score.
+        
         Args:
             features: Dictionary containing both credit and fraud features
+            fast_mode: Skip the credit model when it cannot change the decision
             
         Returns:
             Dictionary with overall_risk_score and components
         """
-        # Extract credit features
-        credit_features = {
-            'account_age_days': features.get('account_age_days', 365.0),
-            'monthly_income': features.get('monthly_income', 50000.0),
-            'total_balance': features.get('total_balance', 100000.0),
-            'transaction_count_30d': features.get('transaction_count_30d', 10.0),
-            'delinquency_count': features.get('delinquency_count', 0.0),
-            'loan_history_count': features.get('loan_history_count', 0.0),
-            'avg_transaction_amount': features.get('avg_transaction_amount', 10000.0),
-            'credit_utilization': features.get('credit_utilization', 0.3),
-            'savings_ratio': features.get('savings_ratio', 0.2)
-        }
-        
-        # Extract fraud features
-        fraud_features = {
-            'amount': features.get('amount', 0.0),
-            'hour': features.get('hour', 12.0),
-            'day_of_week': features.get('day_of_week', 3.0),
-            'transaction_count_24h': features.get('transaction_count_24h', 0.0),
-            'transaction_count_7d': features.get('transaction_count_7d', 5.0),
-            'avg_amount_7d': features.get('avg_amount_7d', 10000.0),
-            'beneficiary_age_days': features.get('beneficiary_age_days', 365.0),
-            'device_risk': features.get('device_risk', 0.0),
-            'location_risk': features.get('location_risk', 0.0),
-            'user_account_age_days': features.get('account_age_days', 365.0),
-            'user_balance': features.get('total_balance', 100000.0),
-            'is_new_beneficiary': 1.0 if features.get('beneficiary_age_days', 365.0) < 7 else 0.0,
-            'is_unusual_hour': 1.0 if features.get('hour', 12.0) < 6 or features.get('hour', 12.0) > 23 else 0.0,
-            'amount_vs_avg_ratio': features.get('amount', 0.0) / max(features.get('avg_amount_7d', 1.0), 1.0),
-            'velocity_score': min(features.get('transaction_count_24h', 0.0) / 10.0, 1.0)
-        }
+        key = self._cache_key(features)
+        result = self._cache_lookup(key, fast_mode)
+        if result is None:
+            result = self._predict_uncached(key, fast_mode)
+            self._cache_store(key, result)
+        return result
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Return prediction cache statistics"""
+        return self._cache.info()
+    
+    def _cache_key(self, features: Dict) -> Tuple:
+        """Build the cache key from the known input features"""
+        return tuple(map(features.get, _CACHE_KEY_NAMES))
+    
+    def _cache_lookup(self, key: Tuple, fast_mode: bool) -> Optional[Dict]:
+        """Return a cached result usable for the request mode"""
+        if fast_mode:
+            # A full result also answers a fast request
+            return self._cache.get(key, key + _FAST_KEY_SUFFIX)
+        return self._cache.get(key)
+    
+    def _cache_store(self, key: Tuple, result: Dict):
+        """Cache a result; results without a credit score never answer full requests"""
+        self._cache.put(key if result["credit_score"] is not None else key + _FAST_KEY_SUFFIX, result)
+    
+    def _fill_rows(self, key: Tuple, credit_row: np.ndarray, fraud_row: np.ndarray):
+        """Write the sub-model feature rows for a cache key, starting from the defaults"""
+        credit_row[:] = _CREDIT_DEFAULTS
+        fraud_row[:] = _FRAUD_DEFAULTS
+        _fill_row(credit_row, key, _CREDIT_KEY_INDEX)
+        _fill_row(fraud_row, key, _FRAUD_KEY_INDEX)
+        _derive_fraud_features(fraud_row, key[_AVG_AMOUNT_KEY_INDEX] is not None)
+    
+    def _predict_uncached(self, key: Tuple, fast_mode: bool = False) -> Dict[str, any]:
+        """Predict overall risk score for a cache key without consulting the cache"""
+        if self._fused is not None:
+            # One fused session run scores both sub-models; nothing left to skip
+            return self._predict_batch_uncached([key])[0]
         
-        # Get credit score
-        credit_result = credit_model.predict(credit_features)
-        credit_score = credit_result['credit_score']
-        
-        # Convert credit score to risk (inverse: higher score = lower risk)
-        credit_risk = 1.0 - (credit_score / 850.0)
+        credit_matrix = np.empty((1, len(_CREDIT_COLS)), dtype=np.float64)
+        fraud_matrix = np.empty((1, _FRAUD_WIDTH), dtype=np.float64)
+        self._fill_rows(key, credit_matrix[0], fraud_matrix[0])
         
         # Get fraud score
-        fraud_result = fraud_model.predict(fraud_features)
-        fraud_risk = fraud_result['fraud_score']
+        fraud_risk = float(self.fraud_model.score_rows(fraud_matrix)[0])
         
         # Calculate amount risk
-        amount = features.get('amount', 0.0)
+        amount = float(fraud_matrix[0, 0])
         amount_risk = self._calculate_amount_risk(amount)
         
+        if fast_mode:
+            result = self._predict_without_credit(fraud_risk, amount_risk)
+            if result is not None:
+                return result
+        
+        # Get credit score
+        credit_score = int(self.credit_model.score_rows(credit_matrix)[0])
+        
+        # Convert credit score to risk (inverse: higher score = lower risk)
+        credit_risk = 1.0 - (credit_score / 850.0)
+        
         # Weighted combination
         overall_risk = (
             credit_risk * 0.4 +    # 40% weight on credit risk
@@ -90,35 +264,174 @@ class RiskScoringModel:
             "recommendation": self._get_recommendation(overall_risk)
         }
     
+    def _predict_without_credit(self, fraud_risk: float, amount_risk: float) -> Optional[Dict[str, any]]:
+        """
+        Decide without the credit model when its contribution cannot matter
+        
+        Args:
+            fraud_risk: Fraud model probability
+            amount_risk: Risk from the transaction amount
+            
+        Returns:
+            Result for the worst-case credit risk, or None if the credit score
+            could change the risk category or recommendation
+        """
+        # Same operation order as the full combination, so the bounds are exact
+        low = max(0.0, min(1.0, _CREDIT_RISK_MIN * 0.4 + fraud_risk * 0.4 + amount_risk * 0.2))
+        high = max(0.0, min(1.0, _CREDIT_RISK_MAX * 0.4 + fraud_risk * 0.4 + amount_risk * 0.2))
+        
+        risk_category = self._get_risk_category(high)
+        recommendation = self._get_recommendation(high)
+        if risk_category != self._get_risk_category(low) or recommendation != self._get_recommendation(low):
+            return None
+        
+        return {
+            "overall_risk_score": float(high),
+            "risk_category": risk_category,
+            "components": {
+                "credit_risk": None,
+                "fraud_risk": float(fraud_risk),
+                "amount_risk": float(amount_risk)
+            },
+            "credit_score": None,
+            "fraud_score": float(fraud_risk),
+            "recommendation": recommendation
+        }
+    
+    def predict_batch(self, features_list: List[Dict], fast_mode: bool = False) -> List[Dict[str, any]]:
+        """
+        Predict overall risk scores for a batch of transactions
+        
+        Cached predictions are reused; the remaining rows are scored with one
+        call per sub-model and combined with array operations. With
+        fast_mode, only the rows whose decision depends on the credit score
+        are passed to the credit model (see predict).
+        
+        Args:
+            features_list: List of dictionaries containing credit and fraud features
+            fast_mode: Skip the credit model for rows where it cannot change the decision
+            
+        Returns:
+            List of dictionaries with overall_risk_score and components, in input order
+        """
+        keys = [self._cache_key(features) for features in features_list]
+        results = [self._cache_lookup(key, fast_mode) for key in keys]
+        
+        # Score each distinct missing key once
+        missing = list(dict.fromkeys(key for key, result in zip(keys, results) if result is None))
+        if missing:
+            computed = dict(zip(missing, self._predict_batch_uncached(missing, fast_mode)))
+            for key, result in computed.items():
+                self._cache_store(key, result)
+            results = [result if result is not None else computed[key] for key, result in zip(keys, results)]
+        
+        return results
+    
+    def _predict_batch_uncached(self, keys: List[Tuple], fast_mode: bool = False) -> List[Dict[str, any]]:
+        """Vectorized risk prediction for cache keys without consulting the cache"""
+        if not keys:
+            return []
+        
+        credit_matrix = np.empty((len(keys), len(_CREDIT_COLS)), dtype=np.float64)
+        fraud_matrix = np.empty((len(keys), _FRAUD_WIDTH), dtype=np.float64)
+        for i, key in enumerate(keys):
+            self._fill_rows(key, credit_matrix[i], fraud_matrix[i])
+        
+        amounts = fraud_matrix[:, 0]
+        # NaN fails every `amount > bound` test, so it takes the lowest risk like the ladder did
+        clamped = np.clip(np.where(np.isnan(amounts), 0.0, amounts), 0.0, _AMOUNT_LUT_MAX)
+        amount_risks = _AMOUNT_RISK_LUT[(-(-clamped // _AMOUNT_BUCKET)).astype(np.intp)]
+        
+        if self._fused is not None:
+            # One fused session run scores both sub-models; nothing left to skip
+            credit_scores, fraud_risks = self._score_fused(credit_matrix, fraud_matrix)
+            has_credit = np.ones(len(keys), dtype=bool)
+        else:
+            fraud_risks = self.fraud_model.score_rows(fraud_matrix)
+            has_credit = (
+                self._needs_credit(fraud_risks.astype(np.float64), amount_risks) if fast_mode
+                else np.ones(len(keys), dtype=bool)
+            )
+            if has_credit.all():
+                credit_scores = self.credit_model.score_rows(credit_matrix)
+            else:
+                credit_scores = np.zeros(len(keys), dtype=np.float64)
+                if has_credit.any():
+                    credit_scores[has_credit] = self.credit_model.score_rows(credit_matrix[has_credit])
+        credit_scores = credit_scores.astype(np.int64)
+        # Backends return float32 probabilities; combine in float64 like the single-row path
+        fraud_risks = fraud_risks.astype(np.float64)
+        
+        # Rows that skipped the credit model take the worst-case credit risk
+        credit_risks = np.where(has_credit, 1.0 - (credit_scores / 850.0), _CREDIT_RISK_MAX)
+        overall_risks = np.clip(credit_risks * 0.4 + fraud_risks * 0.4 + amount_risks * 0.2, 0.0, 1.0)
+        
+        categories = np.searchsorted(_RISK_CATEGORY_BOUNDS, overall_risks, side='right')
+        recommendations = np.searchsorted(_RECOMMENDATION_BOUNDS, overall_risks, side='left')
+        
+        return [
+            {
+                "overall_risk_score": float(overall_risks[i]),
+                "risk_category": _RISK_CATEGORY_LABELS[categories[i]],
+                "components": {
+                    "credit_risk": float(credit_risks[i]) if has_credit[i] else None,
+                    "fraud_risk": float(fraud_risks[i]),
+                    "amount_risk": float(amount_risks[i])
+                },
+                "credit_score": int(credit_scores[i]) if has_credit[i] else None,
+                "fraud_score": float(fraud_risks[i]),
+                "recommendation": _RECOMMENDATION_LABELS[recommendations[i]]
+            }
+            for i in range(len(keys))
+        ]
+    
+    def _needs_credit(self, fraud_risks: np.ndarray, amount_risks: np.ndarray) -> np.ndarray:
+        """
+        Flag the rows whose decision can depend on the credit score
+        
+        Vectorized form of the bound check in _predict_without_credit.
+        
+        Returns:
+            Boolean mask, True where the credit model must be evaluated
+        """
+        low = np.clip(_CREDIT_RISK_MIN * 0.4 + fraud_risks * 0.4 + amount_risks * 0.2, 0.0, 1.0)
+        high = np.clip(_CREDIT_RISK_MAX * 0.4 + fraud_risks * 0.4 + amount_risks * 0.2, 0.0, 1.0)
+        return (
+            (np.searchsorted(_RISK_CATEGORY_BOUNDS, low, side='right')
+             != np.searchsorted(_RISK_CATEGORY_BOUNDS, high, side='right'))
+            | (np.searchsorted(_RECOMMENDATION_BOUNDS, low, side='left')
+               != np.searchsorted(_RECOMMENDATION_BOUNDS, high, side='left'))
+        )
+    
+    def _score_fused(self, credit_matrix: np.ndarray, fraud_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score both sub-models with the fused ONNX graph in a single session run
+        
+        Returns:
+            Clamped credit scores and fraud probabilities, one per row
+        """
+        credit_scores, fraud_risks = self._fused.run(list(FUSED_RISK_OUTPUTS), {
+            FUSED_RISK_INPUTS[0]: credit_matrix.astype(np.float32),
+            FUSED_RISK_INPUTS[1]: fraud_matrix.astype(np.float32)
+        })
+        return credit_scores[:, 0], fraud_risks[:, 0]
+    
     def _calculate_amount_risk(self, amount: float) -> float:
         """Calculate risk based on transaction amount"""
-        if amount > 200000:
-            return 0.8
-        elif amount > 100000:
-            return 0.5
-        elif amount > 50000:
-            return 0.3
-        else:
-            return 0.1
+        # NaN fails every `amount > bound` test, so it takes the lowest risk like the ladder did
+        amount = min(max(amount, 0.0), _AMOUNT_LUT_MAX) if amount == amount else 0.0
+        return _AMOUNT_RISK_LUT_VALUES[int(-(-amount // _AMOUNT_BUCKET))]
     
     def _get_risk_category(self, risk: float) -> str:
         """Get risk category from overall risk score"""
-        if risk < 0.3:
-            return "LOW"
-        elif risk < 0.6:
-            return "MEDIUM"
-        else:
-            return "HIGH"
+        return _RISK_CATEGORY_LABELS[bisect_right(_RISK_CATEGORY_BOUNDS, risk)]
     
     def _get_recommendation(self, risk: float) -> str:
         """Get recommendation based on risk score"""
-        if risk > 0.7:
-            return "BLOCK"
-        elif risk > 0.4:
-            return "REVIEW"
-        else:
-            return "APPROVE"
+        return _RECOMMENDATION_LABELS[bisect_left(_RECOMMENDATION_BOUNDS, risk)]
 
-# Global model instance
-risk_model = RiskScoringModel()
+@lru_cache(maxsize=1)
+def get_risk_model() -> RiskScoringModel:
+    """Return the shared risk scoring model built on the shared sub-models"""
+    return RiskScoringModel(get_credit_model(), get_fraud_model())
 
@@ -0,0 +1,8 @@
+"""
+Shared Router Definitions
+"""
+
+from pydantic import ConfigDict
+
+# Request bodies are read-only inputs: ignore unknown keys, skip assignment checks
+REQUEST_CONFIG = ConfigDict(extra='ignore', frozen=True, validate_assignment=False)
@@ -2,15 +2,43 @@
 Fraud Detection API Router
 """
 
-from fastapi import APIRouter, HTTPException
+import msgspec
+from functools import lru_cache
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Optional
-from app.models.fraud_model import fraud_model
+from typing import Dict, List, Optional
+from app.models.fraud_model import FraudDetectionModel, get_fraud_model
+from app.routers._common import REQUEST_CONFIG
+from app.batching import BatchInferencer, provide_fraud_batcher
 
 router = APIRouter()
 
 class FraudPredictionRequest(BaseModel):
     """Request model for fraud prediction"""
+    model_config = REQUEST_CONFIG
+    
+    amount: float
+    hour: Optional[float] = 12.0
+    day_of_week: Optional[float] = 3.0
+    transaction_count_24h: Optional[float] = 0.0
+    transaction_count_7d: Optional[float] = 0.0
+    avg_amount_7d: Optional[float] = 10000.0
+    beneficiary_age_days: Optional[float] = 365.0
+    device_risk: Optional[float] = 0.0
+    location_risk: Optional[float] = 0.0
+    user_account_age_days: Optional[float] = 365.0
+    user_balance: Optional[float] = 100000.0
+
+class FraudBatchPredictionRequest(BaseModel):
+    """Request model for batch fraud prediction (OpenAPI schema only)"""
+    model_config = REQUEST_CONFIG
+    
+    transactions: List[FraudPredictionRequest]
+
+class FraudTransaction(msgspec.Struct):
+    """Batch transaction decoded with msgspec, mirroring FraudPredictionRequest"""
     amount: float
     hour: Optional[float] = 12.0
     day_of_week: Optional[float] = 3.0
@@ -23,16 +51,28 @@ class FraudPredictionRequest(BaseModel):
     user_account_age_days: Optional[float] = 365.0
     user_balance: Optional[float] = 100000.0
 
-@router.post("/predict")
-async def predict_fraud(request: FraudPredictionRequest):
+class FraudBatch(msgspec.Struct):
+    """Batch payload decoded with msgspec"""
+    transactions: List[FraudTransaction]
+
+_batch_decoder = msgspec.json.Decoder(FraudBatch)
+
+_batch_schema = FraudBatchPredictionRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+_batch_schema.pop("$defs", None)
+
+@router.post("/predict", response_model=None)
+async def predict_fraud(
+    request: FraudPredictionRequest,
+    batcher: BatchInferencer = Depends(provide_fraud_batcher)
+):
     """
     Predict fraud probability for a transaction
     
     Returns fraud score (0.0 to 1.0) and risk level
     """
     try:
-        features = request.dict()
-        result = fraud_model.predict(features)
+        features = request.model_dump()
+        result = await batcher.submit(features)
         return {
             "success": True,
             "result": result
@@ -40,11 +80,51 @@ async def predict_fraud(request: FraudPredictionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@router.post(
+    "/batch",
+    response_model=None,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": _batch_schema}},
+            "required": True
+        }
+    }
+)
+async def predict_fraud_batch(
+    request: Request,
+    fraud_model: FraudDetectionModel = Depends(get_fraud_model)
+):
+    """
+    Predict fraud probability for a batch of transactions
+    
+    Returns one fraud score and risk level per transaction, in request order
+    """
+    # Decode with msgspec; batch payloads grow with N, where Pydantic parsing dominates
+    try:
+        batch = _batch_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid request: {str(e)}")
+    
+    try:
+        features_list = [msgspec.structs.asdict(transaction) for transaction in batch.transactions]
+        results = await run_in_threadpool(fraud_model.predict_batch, features_list)
+        return {
+            "success": True,
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@lru_cache(maxsize=1)
+def _health_response() -> ORJSONResponse:
+    """Serialize the health payload once; the model is loaded once per process"""
+    return ORJSONResponse({
+        "status": "healthy",
+        "model_loaded": get_fraud_model().model is not None
+    })
+
 @router.get("/health")
 async def health_check():
     """Health check for fraud model"""
-    return {
-        "status": "healthy",
-        "model_loaded": fraud_model.model is not None
-    }
+    return _health_response()
 
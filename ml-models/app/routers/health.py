@@ -3,27 +3,32 @@ Health Check Router
 """
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 router = APIRouter()
 
+# Static payloads, serialized once at import instead of on every probe
+_HEALTH_RESPONSE = ORJSONResponse({
+    "status": "healthy",
+    "service": "ML Models Service",
+    "version": "1.0.0"
+})
+
+_READY_RESPONSE = ORJSONResponse({
+    "status": "ready",
+    "models": {
+        "fraud_detection": "available",
+        "credit_scoring": "available",
+        "risk_scoring": "available"
+    }
+})
+
 @router.get("/")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "ML Models Service",
-        "version": "1.0.0"
-    }
+    return _HEALTH_RESPONSE
 
 @router.get("/ready")
 async def readiness_check():
     """Readiness check endpoint"""
-    return {
-        "status": "ready",
-        "models": {
-            "fraud_detection": "available",
-            "credit_scoring": "available",
-            "risk_scoring": "available"
-        }
-    }
-
+    return _READY_RESPONSE
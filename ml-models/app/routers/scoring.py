@@ -2,16 +2,22 @@
 Credit and Risk Scoring API Router
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
-from app.models.credit_model import credit_model
-from app.models.risk_model import risk_model
+from functools import lru_cache
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from app.models.credit_model import get_credit_model
+from app.models.risk_model import RiskScoringModel, get_risk_model
+from app.routers._common import REQUEST_CONFIG
+from app.batching import BatchInferencer, get_fast_risk_batcher, provide_credit_batcher, provide_risk_batcher
+from app.feature_store import FeatureStore, provide_feature_store
 
 router = APIRouter()
 
 class CreditScoringRequest(BaseModel):
     """Request model for credit scoring"""
+    model_config = REQUEST_CONFIG
+    
     account_age_days: float
     monthly_income: Optional[float] = 50000.0
     total_balance: Optional[float] = 100000.0
@@ -24,6 +30,12 @@ class CreditScoringRequest(BaseModel):
 
 class RiskScoringRequest(BaseModel):
     """Request model for risk scoring"""
+    model_config = REQUEST_CONFIG
+    
+    # Feature store key; restricted so it cannot address other Redis keys
+    user_id: Optional[str] = Field(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+    # Skip the credit model when it cannot change the category or recommendation
+    fast_mode: bool = False
     # Credit features
     account_age_days: float
     monthly_income: Optional[float] = 50000.0
@@ -42,16 +54,19 @@ class RiskScoringRequest(BaseModel):
     device_risk: Optional[float] = 0.0
     location_risk: Optional[float] = 0.0
 
-@router.post("/credit")
-async def predict_credit_score(request: CreditScoringRequest):
+@router.post("/credit", response_model=None)
+async def predict_credit_score(
+    request: CreditScoringRequest,
+    batcher: BatchInferencer = Depends(provide_credit_batcher)
+):
     """
     Predict credit score (300-850 range)
     
     Returns credit score, risk category, and score range
     """
     try:
-        features = request.dict()
-        result = credit_model.predict(features)
+        features = request.model_dump()
+        result = await batcher.submit(features)
         return {
             "success": True,
             "result": result
@@ -59,16 +74,31 @@ async def predict_credit_score(request: CreditScoringRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-@router.post("/risk")
-async def predict_risk_score(request: RiskScoringRequest):
+@router.post("/risk", response_model=None)
+async def predict_risk_score(
+    request: RiskScoringRequest,
+    batcher: BatchInferencer = Depends(provide_risk_batcher),
+    feature_store: Optional[FeatureStore] = Depends(provide_feature_store)
+):
     """
     Predict overall risk score combining credit and fraud factors
     
+    With a user_id and a configured feature store, user features omitted
+    from the request are filled from the user's last stored features.
+    
+    With fast_mode, the credit model is skipped when no credit score could
+    change the result; credit_score and credit_risk are then null and
+    overall_risk_score is the worst case.
+    
     Returns overall risk score, category, and recommendation
     """
     try:
-        features = request.dict()
-        result = risk_model.predict(features)
+        features = request.model_dump(exclude={"user_id", "fast_mode"})
+        if request.user_id is not None and feature_store is not None:
+            await _apply_stored_features(feature_store, request, features)
+        if request.fast_mode:
+            batcher = get_fast_risk_batcher()
+        result = await batcher.submit(features)
         return {
             "success": True,
             "result": result
@@ -76,12 +106,36 @@ async def predict_risk_score(request: RiskScoringRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-@router.get("/health")
-async def health_check():
-    """Health check for scoring models"""
+async def _apply_stored_features(feature_store: FeatureStore, request: RiskScoringRequest, features: Dict):
+    """Fill features the client did not send from the store, and store the merged features"""
+    stored = await feature_store.get(request.user_id)
+    if stored is None:
+        await feature_store.put(request.user_id, features)
+        return
+    
+    for name, value in stored.items():
+        if value is not None and name not in request.model_fields_set:
+            features[name] = value
+    
+    # Write through values the client sent, so later calls that omit them see the new ones
+    if any(features.get(name) != value for name, value in stored.items()):
+        await feature_store.put(request.user_id, features)
+
+@lru_cache(maxsize=1)
+def _model_status() -> Dict[str, any]:
+    """Compute the model load flags once; models are loaded once per process"""
     return {
         "status": "healthy",
-        "credit_model_loaded": credit_model.model is not None,
+        "credit_model_loaded": get_credit_model().model is not None,
         "risk_model_loaded": True  # Risk model doesn't require file loading
     }
 
+@router.get("/health")
+async def health_check(risk_model: RiskScoringModel = Depends(get_risk_model)):
+    """Health check for scoring models"""
+    # Only the cache statistics change between calls
+    return {
+        **_model_status(),
+        "risk_cache": risk_model.cache_info()
+    }
+
@@ -0,0 +1,53 @@
+"""
+Model Compilation Script
+Compiles trained fraud and credit models to native shared libraries with Treelite
+"""
+
+import os
+import treelite
+import tl2cgen
+from app.config import settings
+from app.models import _loader
+from app.models._compiled import compiled_path_for
+
+# Quantize split thresholds to integer bins; parallel_comp splits the generated C across files
+COMPILE_PARAMS = {"quantize": 1, "parallel_comp": os.cpu_count() or 1}
+
+def compile_fraud_model():
+    """Compile the XGBoost fraud model"""
+    model = _loader.load(settings.FRAUD_MODEL_PATH)
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    tree_model = treelite.Model.from_xgboost(booster)
+    
+    output_path = compiled_path_for(settings.FRAUD_MODEL_PATH)
+    tl2cgen.export_lib(tree_model, toolchain="gcc", libpath=output_path, params=COMPILE_PARAMS)
+    print(f"Saved compiled fraud model to {output_path}")
+
+def compile_credit_model():
+    """Compile the XGBoost credit model"""
+    model = _loader.load(settings.CREDIT_MODEL_PATH)
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    tree_model = treelite.Model.from_xgboost(booster)
+    
+    output_path = compiled_path_for(settings.CREDIT_MODEL_PATH)
+    tl2cgen.export_lib(tree_model, toolchain="gcc", libpath=output_path, params=COMPILE_PARAMS)
+    print(f"Saved compiled credit model to {output_path}")
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Compiling ML Models with Treelite")
+    print("=" * 50)
+    
+    if os.path.exists(settings.FRAUD_MODEL_PATH):
+        compile_fraud_model()
+    else:
+        print(f"Fraud model not found at {settings.FRAUD_MODEL_PATH}. Run train_models.py first.")
+    
+    if os.path.exists(settings.CREDIT_MODEL_PATH):
+        compile_credit_model()
+    else:
+        print(f"Credit model not found at {settings.CREDIT_MODEL_PATH}. Run train_models.py first.")
+    
+    print("\n" + "=" * 50)
+    print("Compilation Complete!")
+    print("=" * 50)
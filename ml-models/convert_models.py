@@ -0,0 +1,153 @@
+"""
+Model Conversion Script
+Exports trained fraud and credit models to ONNX for ONNX Runtime serving,
+plus a fused risk graph that scores both in one session run
+"""
+
+import copy
+import os
+from typing import Optional
+import onnx
+from onnx import TensorProto, compose, helper
+from onnxmltools.convert import convert_xgboost
+from onnxmltools.convert.common.data_types import FloatTensorType
+from app.config import settings
+from app.models import _loader
+from app.models._onnx import FUSED_RISK_INPUTS, FUSED_RISK_OUTPUTS, onnx_path_for
+
+FRAUD_FEATURE_COUNT = 15
+CREDIT_FEATURE_COUNT = 9
+# Standard-domain opset for the fused risk head when the tree models import none
+FUSED_HEAD_OPSET = 13
+
+def _convert_xgboost_model(model_path: str, feature_count: int, n_classes: Optional[int] = None):
+    """Convert an XGBoost model file to ONNX and return the output path"""
+    model = _loader.load(model_path)
+    
+    # The ONNX converter only understands positional f0..fN feature names
+    model = copy.deepcopy(model)
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    booster.feature_names = None
+    
+    onnx_model = convert_xgboost(
+        model,
+        initial_types=[("input", FloatTensorType([None, feature_count]))]
+    )
+    if n_classes is not None:
+        # A converted Booster declares its probabilities as (N, 1) but produces (N, n_classes)
+        probabilities = next(output for output in onnx_model.graph.output if output.name == "probabilities")
+        probabilities.type.tensor_type.shape.dim[1].dim_value = n_classes
+    
+    output_path = onnx_path_for(model_path)
+    with open(output_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    return output_path
+
+def convert_fraud_model():
+    """Convert the XGBoost fraud model to ONNX"""
+    output_path = _convert_xgboost_model(settings.FRAUD_MODEL_PATH, FRAUD_FEATURE_COUNT, n_classes=2)
+    print(f"Saved fraud ONNX model to {output_path}")
+
+def convert_credit_model():
+    """Convert the XGBoost credit model to ONNX"""
+    output_path = _convert_xgboost_model(settings.CREDIT_MODEL_PATH, CREDIT_FEATURE_COUNT)
+    print(f"Saved credit ONNX model to {output_path}")
+
+def _constant(name: str, values, data_type=TensorProto.FLOAT, dims=()):
+    """Build a Constant node holding a tensor"""
+    values = list(values) if isinstance(values, (list, tuple)) else [values]
+    return helper.make_node(
+        "Constant", [], [name],
+        value=helper.make_tensor(name + "_value", data_type, list(dims), values)
+    )
+
+def _column(data: str, index: int, output: str):
+    """Select one column of an (N, F) tensor as (N, 1)"""
+    indices = output + "_index"
+    return [
+        _constant(indices, [index], TensorProto.INT64, dims=(1,)),
+        helper.make_node("Gather", [data, indices], [output], axis=1)
+    ]
+
+def _clip(data: str, low: str, high: str, output: str):
+    """Clamp with Min/Max so the graph does not depend on the Clip opset version"""
+    return [
+        helper.make_node("Min", [data, high], [output + "_upper"]),
+        helper.make_node("Max", [output + "_upper", low], [output])
+    ]
+
+def build_fused_risk_model():
+    """
+    Fuse the credit and fraud ONNX models into one risk graph
+    
+    Inputs are the credit (N, 9) and fraud (N, 15) feature matrices; outputs
+    are the clamped credit score and the fraud probability, each (N, 1).
+    RiskScoringModel combines them with the amount risk in float64.
+    """
+    credit = compose.add_prefix(onnx.load(onnx_path_for(settings.CREDIT_MODEL_PATH)), prefix="credit_")
+    fraud = compose.add_prefix(onnx.load(onnx_path_for(settings.FRAUD_MODEL_PATH)), prefix="fraud_")
+    credit_input, credit_output = credit.graph.input[0].name, credit.graph.output[0].name
+    fraud_input, fraud_output = fraud.graph.input[0].name, fraud.graph.output[1].name
+    
+    # Disjoint merge: both subgraphs run side by side in one session
+    fused = compose.merge_models(credit, fraud, io_map=[])
+    
+    credit_score, fraud_risk = FUSED_RISK_OUTPUTS
+    nodes = [
+        _constant("score_min", float(settings.CREDIT_SCORE_MIN)),
+        _constant("score_max", float(settings.CREDIT_SCORE_MAX)),
+    ]
+    
+    # Credit score clamped and truncated as the service reports it
+    nodes += _clip(credit_output, "score_min", "score_max", "credit_clamped")
+    nodes.append(helper.make_node("Floor", ["credit_clamped"], [credit_score]))
+    
+    # Fraud probability is column 1 of the classifier's probabilities
+    nodes += _column(fraud_output, 1, fraud_risk)
+    
+    fused.graph.node.extend(nodes)
+    if not any(opset.domain in ("", "ai.onnx") for opset in fused.opset_import):
+        # Tree ensembles live in ai.onnx.ml; the head needs the standard domain
+        fused.opset_import.append(helper.make_opsetid("", FUSED_HEAD_OPSET))
+    del fused.graph.output[:]
+    fused.graph.output.extend(
+        helper.make_tensor_value_info(name, TensorProto.FLOAT, [None, 1]) for name in FUSED_RISK_OUTPUTS
+    )
+    
+    # Serve with fixed input names independent of the converter's naming
+    for graph_input, name in zip((credit_input, fraud_input), FUSED_RISK_INPUTS):
+        for node in fused.graph.node:
+            node.input[:] = [name if value == graph_input else value for value in node.input]
+        next(value for value in fused.graph.input if value.name == graph_input).name = name
+    
+    onnx.checker.check_model(fused)
+    return fused
+
+def fuse_risk_model():
+    """Write the fused credit+fraud risk graph"""
+    fused = build_fused_risk_model()
+    output_path = onnx_path_for(settings.RISK_MODEL_PATH)
+    onnx.save(fused, output_path)
+    print(f"Saved fused risk ONNX model to {output_path}")
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Converting ML Models to ONNX")
+    print("=" * 50)
+    
+    if os.path.exists(settings.FRAUD_MODEL_PATH):
+        convert_fraud_model()
+    else:
+        print(f"Fraud model not found at {settings.FRAUD_MODEL_PATH}. Run train_models.py first.")
+    
+    if os.path.exists(settings.CREDIT_MODEL_PATH):
+        convert_credit_model()
+    else:
+        print(f"Credit model not found at {settings.CREDIT_MODEL_PATH}. Run train_models.py first.")
+    
+    if os.path.exists(settings.FRAUD_MODEL_PATH) and os.path.exists(settings.CREDIT_MODEL_PATH):
+        fuse_risk_model()
+    
+    print("\n" + "=" * 50)
+    print("Conversion Complete!")
+    print("=" * 50)
@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration for production serving
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The app is imported once in the master with models preloaded, then
+workers are forked and share the model pages copy-on-write.
+"""
+
+import multiprocessing
+import os
+
+# Load models in the master before forking (see PRELOAD_MODELS in app/main.py)
+os.environ.setdefault("PRELOAD_MODELS", "true")
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '9000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+accesslog = None
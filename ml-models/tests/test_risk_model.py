@@ -0,0 +1,224 @@
+"""
+Risk Scoring Regression Tests
+Compares the cached, vectorized risk model against the original rule ladders
+at the band edges, using the mock sub-models
+"""
+
+import itertools
+import random
+import pytest
+from app.config import settings
+from app.models.credit_model import CreditScoringModel
+from app.models.fraud_model import FraudDetectionModel
+from app.models.risk_model import RiskScoringModel
+
+# Values on, just inside and just outside every ladder bound
+EDGE_VALUES = {
+    'amount': [0.0, 40.0, 49960.0, 50000.0, 50000.5, 50040.0, 99999.0, 100000.0, 100049.0,
+               199960.0, 200000.0, 200040.0, 500000.0],
+    'monthly_income': [None, 24960.0, 25000.0, 25040.0, 50000.0, 50040.0, 99960.0, 100000.0, 100049.0],
+    'total_balance': [None, 49951.0, 50000.0, 50049.0, 100000.0, 100049.0],
+    'account_age_days': [None, 90.0, 91.0, 180.0, 181.0, 365.0, 366.0],
+    'hour': [None, 0.0, 5.5, 6.0, 23.0, 23.5],
+    'avg_amount_7d': [None, 0.0, 0.5, 40.0, 10000.0],
+    'beneficiary_age_days': [None, 6.0, 6.5, 7.0],
+    'transaction_count_24h': [None, 5.0, 6.0, 10.0, 11.0],
+    'delinquency_count': [None, 0.0, 1.0, 3.0],
+    'loan_history_count': [None, 0.0, 1.0],
+    'device_risk': [None, 0.0, 0.004, 0.005, 0.5, 1.0],
+    'location_risk': [None, 0.0, 0.006, 0.995],
+}
+
+def _reference_fraud_score(features):
+    """Fraud mock ladder as originally written"""
+    amount = features.get('amount', 0.0)
+    score = 0.0
+    if amount > 200000:
+        score += 0.4
+    elif amount > 100000:
+        score += 0.2
+    elif amount > 50000:
+        score += 0.1
+    if features.get('beneficiary_age_days', 365.0) < 7:
+        score += 0.3
+    txn_count_24h = features.get('transaction_count_24h', 0.0)
+    if txn_count_24h > 10:
+        score += 0.3
+    elif txn_count_24h > 5:
+        score += 0.15
+    score += features.get('device_risk', 0.0) * 0.1
+    score += features.get('location_risk', 0.0) * 0.1
+    return min(score, 1.0)
+
+def _reference_credit_score(features):
+    """Credit mock ladder as originally written"""
+    account_age = features.get('account_age_days', 365.0)
+    income = features.get('monthly_income', 50000.0)
+    balance = features.get('total_balance', 100000.0)
+    score = 600.0
+    if account_age > 365:
+        score += 50
+    elif account_age > 180:
+        score += 30
+    elif account_age > 90:
+        score += 15
+    if income > 100000:
+        score += 100
+    elif income > 50000:
+        score += 60
+    elif income > 25000:
+        score += 30
+    score -= features.get('delinquency_count', 0.0) * 20
+    if features.get('loan_history_count', 0.0) > 0:
+        score += 30
+    if balance > 100000:
+        score += 50
+    elif balance > 50000:
+        score += 30
+    return int(max(settings.CREDIT_SCORE_MIN, min(settings.CREDIT_SCORE_MAX, score)))
+
+def _reference_predict(features):
+    """Risk combination and threshold ladders as originally written"""
+    credit_score = _reference_credit_score(features)
+    credit_risk = 1.0 - (credit_score / 850.0)
+    fraud_risk = _reference_fraud_score(features)
+    amount = features.get('amount', 0.0)
+    if amount > 200000:
+        amount_risk = 0.8
+    elif amount > 100000:
+        amount_risk = 0.5
+    elif amount > 50000:
+        amount_risk = 0.3
+    else:
+        amount_risk = 0.1
+    overall_risk = max(0.0, min(1.0, credit_risk * 0.4 + fraud_risk * 0.4 + amount_risk * 0.2))
+    if overall_risk < 0.3:
+        category = "LOW"
+    elif overall_risk < 0.6:
+        category = "MEDIUM"
+    else:
+        category = "HIGH"
+    if overall_risk > 0.7:
+        recommendation = "BLOCK"
+    elif overall_risk > 0.4:
+        recommendation = "REVIEW"
+    else:
+        recommendation = "APPROVE"
+    return {
+        "overall_risk_score": overall_risk,
+        "risk_category": category,
+        "components": {
+            "credit_risk": credit_risk,
+            "fraud_risk": fraud_risk,
+            "amount_risk": amount_risk
+        },
+        "credit_score": credit_score,
+        "fraud_score": fraud_risk,
+        "recommendation": recommendation
+    }
+
+def _edge_requests(count=600, seed=7):
+    """Requests drawn from the edge values; None leaves a feature out"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        features = {}
+        for name, values in EDGE_VALUES.items():
+            value = rng.choice(values)
+            if value is not None:
+                features[name] = value
+        requests.append(features)
+    # Every amount edge against every income and balance edge, other features defaulted
+    for amount, income, balance in itertools.product(
+        EDGE_VALUES['amount'], EDGE_VALUES['monthly_income'], EDGE_VALUES['total_balance']
+    ):
+        features = {'amount': amount}
+        if income is not None:
+            features['monthly_income'] = income
+        if balance is not None:
+            features['total_balance'] = balance
+        requests.append(features)
+    return requests
+
+@pytest.fixture
+def risk_model(tmp_path):
+    """Risk model over mock sub-models (no trained model files)"""
+    credit_model = CreditScoringModel(str(tmp_path / "credit_scoring_model.ubj"))
+    fraud_model = FraudDetectionModel(str(tmp_path / "fraud_detection_model.ubj"))
+    return RiskScoringModel(credit_model, fraud_model)
+
+def _assert_matches(result, expected):
+    assert result["risk_category"] == expected["risk_category"]
+    assert result["recommendation"] == expected["recommendation"]
+    assert result["credit_score"] == expected["credit_score"]
+    assert result["overall_risk_score"] == pytest.approx(expected["overall_risk_score"], abs=1e-12)
+    assert result["fraud_score"] == pytest.approx(expected["fraud_score"], abs=1e-12)
+    for name, value in expected["components"].items():
+        assert result["components"][name] == pytest.approx(value, abs=1e-12)
+
+def test_predict_matches_reference_ladders_at_band_edges(risk_model):
+    for features in _edge_requests():
+        expected = _reference_predict(features)
+        # Second call is served from the cache
+        _assert_matches(risk_model.predict(features), expected)
+        _assert_matches(risk_model.predict(features), expected)
+
+def test_predict_batch_matches_reference_ladders_at_band_edges(risk_model):
+    requests = _edge_requests()
+    for features, result in zip(requests, risk_model.predict_batch(requests)):
+        _assert_matches(result, _reference_predict(features))
+
+def test_nearby_inputs_do_not_share_cached_results(risk_model):
+    below = risk_model.predict({'amount': 50000.0})
+    above = risk_model.predict({'amount': 50040.0})
+    assert below["components"]["amount_risk"] == 0.1
+    assert above["components"]["amount_risk"] == 0.3
+
+def test_fast_mode_keeps_the_full_decision(risk_model):
+    requests = _edge_requests()
+    # Fast results are cached apart, so the full predictions are computed afresh
+    batch_results = risk_model.predict_batch(requests, fast_mode=True)
+    full_results = [risk_model.predict(features) for features in requests]
+    skipped = 0
+    for features, full, fast in zip(requests, full_results, batch_results):
+        assert fast["risk_category"] == full["risk_category"]
+        assert fast["recommendation"] == full["recommendation"]
+        if fast["credit_score"] is None:
+            skipped += 1
+            assert fast["components"]["credit_risk"] is None
+            assert fast["overall_risk_score"] >= full["overall_risk_score"]
+        else:
+            assert fast == full
+    assert skipped > 0
+
+def test_fast_mode_single_row_matches_batch(tmp_path):
+    credit_model = CreditScoringModel(str(tmp_path / "credit_scoring_model.ubj"))
+    fraud_model = FraudDetectionModel(str(tmp_path / "fraud_detection_model.ubj"))
+    requests = _edge_requests()
+    single = RiskScoringModel(credit_model, fraud_model)
+    batch = RiskScoringModel(credit_model, fraud_model)
+    assert [single.predict(features, fast_mode=True) for features in requests] == \
+        batch.predict_batch(requests, fast_mode=True)
+
+def test_fast_mode_counts_one_miss_per_lookup(risk_model):
+    features = {'amount': 1000.0, 'account_age_days': 400.0}
+    risk_model.predict(features, fast_mode=True)
+    risk_model.predict(features, fast_mode=True)
+    info = risk_model.cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+@pytest.mark.parametrize("amount", [float('inf'), float('-inf'), float('nan'), 1e300, -1e300])
+def test_non_finite_and_extreme_amounts_follow_the_ladder(risk_model, amount):
+    features = {'amount': amount, 'account_age_days': 400.0}
+    expected = _reference_predict(features)
+    _assert_matches(risk_model.predict(features), expected)
+    _assert_matches(risk_model.predict_batch([features, {'amount': 1000.0}])[0], expected)
+
+@pytest.mark.parametrize("name", [
+    'amount', 'beneficiary_age_days', 'transaction_count_24h',
+    'account_age_days', 'monthly_income', 'total_balance', 'loan_history_count'
+])
+@pytest.mark.parametrize("value", [float('inf'), float('-inf'), float('nan')])
+def test_non_finite_ladder_inputs_follow_the_ladder(risk_model, name, value):
+    features = {'account_age_days': 400.0, name: value}
+    _assert_matches(risk_model.predict(features), _reference_predict(features))
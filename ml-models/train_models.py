@@ -4,12 +4,26 @@ Trains fraud detection and credit scoring models
 """
 
 import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
 import xgboost as xgb
-import joblib
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Exports that convert_models.py and compile_models.py build from a trained
+# model. The service serves them in preference to the model file, so they
+# go stale as soon as the model is retrained.
+EXPORT_EXTENSIONS = (".onnx", ".so")
+FUSED_RISK_EXPORT = "models/risk_scoring_model.onnx"
+
+def remove_stale_exports(model_path):
+    """Delete exports built from a previous version of a model"""
+    base = os.path.splitext(model_path)[0]
+    for path in [base + extension for extension in EXPORT_EXTENSIONS] + [FUSED_RISK_EXPORT]:
+        try:
+            os.remove(path)
+            print(f"Removed stale export {path}")
+        except FileNotFoundError:
+            pass
 
 def generate_synthetic_data(n_samples=10000):
     """Generate synthetic training data"""
@@ -35,19 +49,13 @@ def generate_synthetic_data(n_samples=10000):
     }
     
     # Generate fraud labels (higher probability for suspicious patterns)
-    fraud_labels = []
-    for i in range(n_samples):
-        prob = 0.1  # Base probability
-        if fraud_data['amount'][i] > 100000:
-            prob += 0.3
-        if fraud_data['beneficiary_age_days'][i] < 7:
-            prob += 0.2
-        if fraud_data['transaction_count_24h'][i] > 5:
-            prob += 0.2
-        if fraud_data['device_risk'][i] > 0.5:
-            prob += 0.2
-        prob = min(prob, 0.95)
-        fraud_labels.append(np.random.binomial(1, prob))
+    prob = np.full(n_samples, 0.1)  # Base probability
+    prob += 0.3 * (fraud_data['amount'] > 100000)
+    prob += 0.2 * (fraud_data['beneficiary_age_days'] < 7)
+    prob += 0.2 * (fraud_data['transaction_count_24h'] > 5)
+    prob += 0.2 * (fraud_data['device_risk'] > 0.5)
+    prob = np.minimum(prob, 0.95)
+    fraud_labels = np.random.binomial(1, prob)
     
     # Credit scoring features
     credit_data = {
@@ -63,32 +71,34 @@ def generate_synthetic_data(n_samples=10000):
     }
     
     # Generate credit scores (300-850 range)
-    credit_scores = []
-    for i in range(n_samples):
-        score = 600  # Base score
-        score += min(credit_data['account_age_days'][i] / 10, 50)
-        score += min(credit_data['monthly_income'][i] / 1000, 100)
-        score -= credit_data['delinquency_count'][i] * 20
-        score += credit_data['loan_history_count'][i] * 10
-        score = max(300, min(850, score + np.random.normal(0, 30)))
-        credit_scores.append(score)
-    
-    return pd.DataFrame(fraud_data), np.array(fraud_labels), pd.DataFrame(credit_data), np.array(credit_scores)
+    score = (
+        600  # Base score
+        + np.minimum(credit_data['account_age_days'] / 10, 50)
+        + np.minimum(credit_data['monthly_income'] / 1000, 100)
+        - credit_data['delinquency_count'] * 20
+        + credit_data['loan_history_count'] * 10
+        + np.random.normal(0, 30, n_samples)
+    )
+    credit_scores = np.clip(score, 300, 850)
+    
+    # Stack columns straight into float32 feature matrices, the dtype the service predicts with
+    fraud_X = np.column_stack(list(fraud_data.values())).astype(np.float32)
+    credit_X = np.column_stack(list(credit_data.values())).astype(np.float32)
+    
+    return fraud_X, fraud_labels, credit_X, credit_scores
 
-def train_fraud_model():
+def train_fraud_model(fraud_X, fraud_labels):
     """Train fraud detection model"""
-    print("Generating synthetic fraud data...")
-    fraud_df, fraud_labels, _, _ = generate_synthetic_data(10000)
-    
     print("Training fraud detection model...")
     X_train, X_test, y_train, y_test = train_test_split(
-        fraud_df, fraud_labels, test_size=0.2, random_state=42
+        fraud_X, fraud_labels, test_size=0.2, random_state=42
     )
     
     model = xgb.XGBClassifier(
         n_estimators=100,
         max_depth=5,
         learning_rate=0.1,
+        tree_method='hist',
         random_state=42
     )
     
@@ -99,27 +109,28 @@ def train_fraud_model():
     test_score = model.score(X_test, y_test)
     print(f"Fraud Model - Train Score: {train_score:.4f}, Test Score: {test_score:.4f}")
     
-    # Save model
+    # Save model in XGBoost's native binary format (UBJSON)
     os.makedirs("models", exist_ok=True)
-    model_path = "models/fraud_detection_model.pkl"
-    joblib.dump(model, model_path)
+    model_path = "models/fraud_detection_model.ubj"
+    model.get_booster().save_model(model_path)
     print(f"Saved fraud model to {model_path}")
+    remove_stale_exports(model_path)
     
     return model
 
-def train_credit_model():
+def train_credit_model(credit_X, credit_scores):
     """Train credit scoring model"""
-    print("Generating synthetic credit data...")
-    _, _, credit_df, credit_scores = generate_synthetic_data(10000)
-    
     print("Training credit scoring model...")
     X_train, X_test, y_train, y_test = train_test_split(
-        credit_df, credit_scores, test_size=0.2, random_state=42
+        credit_X, credit_scores, test_size=0.2, random_state=42
     )
     
-    model = RandomForestRegressor(
+    model = xgb.XGBRegressor(
         n_estimators=100,
-        max_depth=10,
+        max_depth=6,
+        learning_rate=0.1,
+        tree_method='hist',
+        n_jobs=-1,
         random_state=42
     )
     
@@ -130,11 +141,12 @@ def train_credit_model():
     test_score = model.score(X_test, y_test)
     print(f"Credit Model - Train R²: {train_score:.4f}, Test R²: {test_score:.4f}")
     
-    # Save model
+    # Save model in XGBoost's native binary format (UBJSON)
     os.makedirs("models", exist_ok=True)
-    model_path = "models/credit_scoring_model.pkl"
-    joblib.dump(model, model_path)
+    model_path = "models/credit_scoring_model.ubj"
+    model.get_booster().save_model(model_path)
     print(f"Saved credit model to {model_path}")
+    remove_stale_exports(model_path)
     
     return model
 
@@ -143,15 +155,18 @@ if __name__ == "__main__":
     print("Training ML Models")
     print("=" * 50)
     
-    # Train fraud model
-    print("\n1. Training Fraud Detection Model")
-    print("-" * 50)
-    train_fraud_model()
+    # Generate data once for both models
+    print("\nGenerating synthetic data...")
+    fraud_X, fraud_labels, credit_X, credit_scores = generate_synthetic_data(10000)
     
-    # Train credit model
-    print("\n2. Training Credit Scoring Model")
+    # Train both models concurrently; XGBoost releases the GIL while fitting
+    print("\nTraining Fraud Detection and Credit Scoring Models")
     print("-" * 50)
-    train_credit_model()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        fraud_future = executor.submit(train_fraud_model, fraud_X, fraud_labels)
+        credit_future = executor.submit(train_credit_model, credit_X, credit_scores)
+        fraud_future.result()
+        credit_future.result()
     
     print("\n" + "=" * 50)
     print("Training Complete!")